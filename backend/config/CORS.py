@@ -85,11 +85,19 @@ def get_cors_config() -> dict:
             "X-Forwarded-For",
             "X-Forwarded-Proto",
             "User-Agent",
+            "Upload-Length",      # Resumable uploads
+            "Upload-Offset",
+            "Upload-Filename",
         ],
         "expose_headers": [
             "Content-Disposition",
             "Content-Length",
             "Content-Type",
+            "Location",
+            "Upload-Length",
+            "Upload-Offset",
+            "X-Whisper-Model",
+            "X-Requested-Model",
         ],
         "max_age": 3600,  # Cache preflight response for 1 hour
     }
@@ -1,16 +1,28 @@
-from fastapi import FastAPI, UploadFile, File, Form
-from fastapi.responses import FileResponse
+from fastapi import FastAPI, UploadFile, File, Form, Header, Request, WebSocket, WebSocketDisconnect
+from fastapi.responses import FileResponse, JSONResponse, Response, StreamingResponse
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
+from starlette.background import BackgroundTask
 from fastapi.staticfiles import StaticFiles
 import os
-from src.audio_to_text import chunk_audio, transcribe_chunks, save_dataset
-from src.summarize import summarize_existing_dataset
-from src.bullet_text import text_to_bullets
-from src.decorators import json_to_text
-from src.bullet_to_text import json_bullets_to_text
-from util.recorder import record_audio
+from src.model_registry import registry
+from src import summarizer, metrics, resources
+from src.pipeline import process_audio, iter_process_audio, OUTPUT_FORMATS, OUTPUT_FORMAT_ERROR
+from src.parallel_transcribe import DEFAULT_WORKERS
+from src.batch import process_batch
+from src.result_cache import result_cache
+from src.transcript_store import transcript_store
+from src.search_index import search_index, index_result
+from src.vad import VAD_ENABLED
+from src.live import LiveSession, to_float32
+from backend.services.jobs import jobs, QueueFull
+from backend.services.uploads import uploads, UploadError, MAX_UPLOAD_MB
+from backend.services import scheduler, warmup
+import asyncio
+from typing import List
 import tempfile
-import shutil
+import uuid
+import time
 import json
 
 app = FastAPI(
@@ -58,6 +70,16 @@ except (RuntimeError, FileNotFoundError) as e:
     print(f"⚠️  Static files directory not found: {e}")
     pass
 
+# Give this worker its share of the cores before any model runs
+@app.on_event("startup")
+async def allocate_cpus():
+    resources.apply(pool_workers=DEFAULT_WORKERS)
+
+# Load WARMUP_MODELS in the background; the worker accepts requests meanwhile and /ready tells when they're loaded
+@app.on_event("startup")
+async def warm_up_models():
+    warmup.start()
+
 # Health check endpoint
 @app.get("/")
 async def root():
@@ -72,61 +94,132 @@ async def root():
 async def health_check():
     return {"status": "ok", "service": "audio-processor"}
 
+# Readiness for load balancers: 503 until the warm-up models are loaded
+@app.get("/ready")
+async def readiness_check():
+    status = warmup.status()
+    status["models"] = {"whisper": registry.loaded(), "summarizer": summarizer.is_loaded()}
+    return JSONResponse(status_code=200 if status["ready"] else 503, content=status)
+
+# Loaded Whisper models with load times and cache hit/miss counts
+@app.get("/models")
+async def model_stats():
+    return registry.stats()
+
+# Cores, torch threads and pool layout of the worker that answers
+@app.get("/resources")
+async def resource_stats():
+    return resources.stats(pool_workers=DEFAULT_WORKERS)
+
+# Result cache size and hit rates
+@app.get("/cache")
+async def cache_stats():
+    if result_cache is None:
+        return {"enabled": False}
+    return await run_in_threadpool(result_cache.stats)
+
+# Prometheus scrape endpoint: stage latencies, audio processed, queue depth, loaded models
+@app.get("/metrics")
+async def prometheus_metrics():
+    job_stats = jobs.stats()
+    for status in ("queued", "running"):
+        metrics.jobs_gauge.set(job_stats[status], status=status)
+    metrics.models_loaded.set(len(registry.loaded()), kind="whisper")
+    metrics.models_loaded.set(int(summarizer.is_loaded()), kind="summarizer")
+    return Response(content=metrics.render(), media_type="text/plain; version=0.0.4")
+
 # Define directories
 DATASET_DIR = "./dataset"
-CHUNK_DIR = os.path.join(DATASET_DIR, "chunks")
-OUTPUT_JSON = os.path.join(DATASET_DIR, "output", "dataset.json")
-SUMMARIZED_JSON = os.path.join(DATASET_DIR, "summarized", "normal", "dataset_summarized.json")
-SUMMARIZED_TXT = os.path.join(DATASET_DIR, "summarized", "normal", "dataset_summarized.txt")
-BULLET_JSON = os.path.join(DATASET_DIR, "summarized", "bullet", "dataset_bullets.json")
-BULLET_TXT = os.path.join(DATASET_DIR, "summarized", "bullet", "dataset_bullets.txt")
+JOBS_DIR = os.path.join(DATASET_DIR, "jobs")  # Per-job outputs, only written when persisting
 TEMP_DIR = os.path.join(os.getcwd(), "temp")  # Custom temp directory in project folder
+PERSIST_JOB_OUTPUTS = os.getenv("PERSIST_JOB_OUTPUTS", "False").lower() == "true"
 
 # Create temp directory if it doesn't exist
 os.makedirs(TEMP_DIR, exist_ok=True)
 
-def process_audio(audio_path, output_format="plain", chunk_minutes=5, model_name="base"):
-    # Ensure directories exist
-    os.makedirs(CHUNK_DIR, exist_ok=True)
-    os.makedirs(os.path.dirname(OUTPUT_JSON), exist_ok=True)
-    os.makedirs(os.path.dirname(SUMMARIZED_JSON), exist_ok=True)
-    os.makedirs(os.path.dirname(BULLET_JSON), exist_ok=True)
-
-    # Step 1: Chunk audio
-    chunk_files = chunk_audio(audio_path, CHUNK_DIR, chunk_minutes=chunk_minutes)
-
-    # Step 2: Transcribe chunks with Whisper
-    transcripts = transcribe_chunks(chunk_files, model_name=model_name)
-
-    # Step 3: Save dataset
-    save_dataset(transcripts, OUTPUT_JSON)
-
-    if output_format == "plain":
-        # Step 4: Summarize
-        summarize_existing_dataset(OUTPUT_JSON, SUMMARIZED_JSON, chunk_minutes=chunk_minutes)
-
-        # Step 5: Convert to text
-        with open(SUMMARIZED_JSON, "r", encoding="utf-8") as f:
-            json_data = json.load(f)
-        text_content = json_to_text(json_data, title="Summary")
-        with open(SUMMARIZED_TXT, "w", encoding="utf-8") as f:
-            f.write(text_content)
-        return SUMMARIZED_TXT
-
-    elif output_format == "bullet":
-        # Step 4: Bulletize
-        text_to_bullets(OUTPUT_JSON, BULLET_JSON, chunk_minutes=chunk_minutes)
-
-        # Step 5: Convert to text
-        with open(BULLET_JSON, "r", encoding="utf-8") as f:
-            json_data = json.load(f)
-        text_content = json_bullets_to_text(json_data, title="Bullet Summary")
-        with open(BULLET_TXT, "w", encoding="utf-8") as f:
-            f.write(text_content)
-        return BULLET_TXT
+def job_output_dir(job_id):
+    """Directory for a job's intermediate files, or None when persistence is off."""
+    return os.path.join(JOBS_DIR, job_id) if PERSIST_JOB_OUTPUTS else None
 
-    else:
-        raise ValueError("Invalid output_format. Choose 'plain' or 'bullet'.")
+def run_job(job_id, audio_path, run):
+    """
+    Run a queued job. With the transcript store enabled every chunk is saved
+    as it completes, and a job that ran before continues from its first
+    missing chunk.
+    """
+    journal = None
+    if transcript_store is not None:
+        journal = transcript_store.journal(job_id)
+        if journal.resumed_from():
+            print(f"Resuming job {job_id} after {journal.resumed_from()} transcribed chunks")
+        transcript_store.start(job_id)
+
+    try:
+        result = process_audio(
+            audio_path, run["output_format"], run["chunk_minutes"], run["model_name"], run["workers"],
+            output_dir=job_output_dir(job_id), cache=result_cache, vad=run["vad"], overview=run["overview"],
+            journal=journal,
+        )
+    except Exception as e:
+        if transcript_store is not None:
+            transcript_store.fail(job_id, str(e))
+        raise
+
+    if transcript_store is not None:
+        transcript_store.finish(job_id, result)
+    index_result(job_id, run.get("name"), result, run["chunk_minutes"], model=run["model_name"])
+    return result
+
+def release_job_audio(job_id, audio_path):
+    # A failed job keeps its audio so POST /jobs/{job_id}/resume can pick it up again
+    job = transcript_store.get(job_id) if transcript_store is not None else None
+    if job is None or job["status"] != "failed":
+        remove_file(audio_path)
+
+def queue_job(job_id, audio_path, run, params, estimate=None):
+    """Queue `run_job`. Raises QueueFull like `jobs.submit`."""
+    jobs.submit(
+        run_job, job_id, audio_path, run,
+        job_id=job_id,
+        params=params,
+        cleanup=lambda: release_job_audio(job_id, audio_path),
+        estimate=estimate,
+    )
+
+def stored_job(job_id):
+    """A job from the transcript store in the shape `jobs.get` returns, e.g. after a restart."""
+    job = transcript_store.get(job_id) if transcript_store is not None else None
+    if job is None:
+        return None
+    finished = job["status"] in ("done", "failed")
+    return {
+        "id": job_id,
+        "status": job["status"],
+        "params": job["params"],
+        "created_at": job["created_at"],
+        "started_at": None,
+        "finished_at": job["updated_at"] if finished else None,
+        "error": job["error"],
+        "result": job["result"],
+    }
+
+# Pick up jobs that were cut short by a crash or restart
+@app.on_event("startup")
+async def resume_interrupted_jobs():
+    if transcript_store is None:
+        return
+    for audio_path in transcript_store.prune():
+        remove_file(audio_path)
+
+    for job in transcript_store.claim_orphans():
+        if not job["audio_path"] or not os.path.exists(job["audio_path"]):
+            transcript_store.fail(job["job_id"], "Audio is no longer available")
+            continue
+        try:
+            queue_job(job["job_id"], job["audio_path"], job["run"], job["params"])
+            print(f"Requeued interrupted job {job['job_id']}")
+        except QueueFull:
+            transcript_store.fail(job["job_id"], "Job queue was full on restart, resume it with POST /jobs/{job_id}/resume")
 
 @app.post("/process-audio/")
 async def process_audio_endpoint(
@@ -134,61 +227,665 @@ async def process_audio_endpoint(
     record: bool = Form(False),
     output_format: str = Form("plain"),
     chunk_minutes: int = Form(5),
-    model_name: str = Form("base")
+    model_name: str = Form("base"),
+    workers: int = Form(0),
+    vad: bool = Form(VAD_ENABLED),
+    overview: bool = Form(False),
+    deadline_seconds: float = Form(0)
 ):
     """
     Process audio file or record audio and return processed text file.
     
-    - **file**: Audio file to process (optional if record=True)
-    - **record**: Whether to record audio instead of using uploaded file
-    - **output_format**: 'plain' for summary or 'bullet' for bullet points
+    - **file**: Audio file to process
+    - **record**: No longer supported; use the /ws/record WebSocket for live audio
+    - **output_format**: 'plain' for summary or 'bullet' for bullet points; 'extractive' and
+      'extractive_bullet' are fast previews that pick key sentences instead of running BART
     - **chunk_minutes**: Duration of each chunk in minutes (1-30)
     - **model_name**: Whisper model to use ('base', 'small', 'medium', 'large')
+    - **workers**: Transcription worker processes (0 uses TRANSCRIBE_WORKERS)
+    - **vad**: Skip silence and cut chunks at pauses
+    - **overview**: Add a document-level summary of the whole recording
+    - **deadline_seconds**: Latency target; a smaller Whisper model is used if
+      the requested one would miss it (0 = best effort, always the requested model).
+      The model used is reported in the X-Whisper-Model header.
+
+    Responds with 429 when JOB_QUEUE_SIZE requests are already being processed this way.
     """
     import os
 
+    try:
+        slot = jobs.reserve()
+    except QueueFull:
+        return queue_full_response()
+
     temp_audio_path = None
     try:
         # Create a temporary file in your TEMP_DIR
         with tempfile.NamedTemporaryFile(dir=TEMP_DIR, delete=False, suffix=".wav") as temp_audio:
             temp_audio_path = temp_audio.name
 
-        # If recording
+        # Server-side recording blocked the worker; live audio goes through /ws/record
         if record:
-            record_audio(filename=temp_audio_path)
-        else:
-            if not file:
-                return {"error": "No audio file provided and record not enabled"}
-            
-            # Validate file type
-            if not file.content_type.startswith('audio/'):
-                return {"error": "Invalid file type. Please upload an audio file."}
-            
-            # Write uploaded file to temp file
-            with open(temp_audio_path, "wb") as f:
-                shutil.copyfileobj(file.file, f)
-
-        # Process the audio
-        output_file = process_audio(temp_audio_path, output_format, chunk_minutes, model_name)
+            return {"error": "Server-side recording is not supported. Stream audio to /ws/record instead."}
 
-        # Return the result
-        return FileResponse(
-            path=output_file,
-            media_type="text/plain",
-            filename=os.path.basename(output_file),
-            headers={
-                "Access-Control-Expose-Headers": "Content-Disposition",
-                "Content-Disposition": f"attachment; filename={os.path.basename(output_file)}"
-            }
+        error = await save_upload(file, temp_audio_path)
+        if error:
+            return error
+
+        schedule = await run_in_threadpool(
+            scheduler.plan, temp_audio_path, model_name, deadline_seconds or None, jobs.backlog_seconds()
         )
+        slot.start(scheduler.run_seconds(schedule))
+
+        # Process the audio in the threadpool so the event loop keeps serving other requests
+        recording_id = uuid.uuid4().hex
+        with metrics.requests_in_flight.track(endpoint="process-audio"):
+            result = await run_in_threadpool(
+                process_audio, temp_audio_path, output_format, chunk_minutes, schedule["model"], workers,
+                output_dir=job_output_dir(recording_id), cache=result_cache, vad=vad,
+                overview=overview
+            )
+        await run_in_threadpool(index_result, recording_id, file.filename, result, chunk_minutes,
+                                model=schedule["model"])
+
+        # Return the result
+        return text_file_response(result, schedule)
 
     except Exception as e:
         return {"error": f"Processing failed: {str(e)}"}
 
     finally:
+        slot.release()
         # Clean up the temporary audio file
-        if temp_audio_path and os.path.exists(temp_audio_path):
-            os.remove(temp_audio_path)
+        remove_file(temp_audio_path)
+
+async def save_upload(file, path):
+    """Copy an uploaded audio file to `path`. Returns an error dict if it isn't usable."""
+    if not file:
+        return {"error": "No audio file provided and record not enabled"}
+
+    # Validate file type
+    if not file.content_type.startswith('audio/'):
+        return {"error": "Invalid file type. Please upload an audio file."}
+
+    # Write uploaded file to temp file, stopping at the size limit
+    def copy():
+        copied = 0
+        with open(path, "wb") as f:
+            for block in iter(lambda: file.file.read(1024 * 1024), b""):
+                copied += len(block)
+                if copied > uploads.max_bytes:
+                    return False
+                f.write(block)
+        return True
+
+    if not await run_in_threadpool(copy):
+        return {"error": f"File too large. The limit is {MAX_UPLOAD_MB} MB; use /uploads/ for resumable uploads."}
+    return None
+
+def queue_full_response():
+    return JSONResponse(
+        status_code=429,
+        content={"error": "Job queue is full, try again later."},
+        headers={"Retry-After": "30"},
+    )
+
+def queued_response(job_id, **extra):
+    return {
+        "job_id": job_id,
+        "status": "queued",
+        "status_url": f"/jobs/{job_id}",
+        "result_url": f"/jobs/{job_id}/result",
+        **extra,
+    }
+
+def remove_file(path):
+    if path and os.path.exists(path):
+        os.remove(path)
+
+def text_file_response(result, schedule=None):
+    headers = {
+        "Access-Control-Expose-Headers": "Content-Disposition, X-Whisper-Model, X-Requested-Model",
+        "Content-Disposition": f"attachment; filename={result['filename']}"
+    }
+    if schedule:
+        # Which model actually ran, in case the scheduler downgraded it
+        headers["X-Whisper-Model"] = schedule["model"]
+        headers["X-Requested-Model"] = schedule["requested_model"]
+    return Response(content=result["text"], media_type="text/plain", headers=headers)
+
+def sse_event(event, data):
+    """Format one Server-Sent Event."""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+# Server-Sent Events: push each chunk's transcript and summary as soon as it is ready
+@app.post("/process-audio/stream")
+async def process_audio_stream(
+    file: UploadFile = File(None),
+    output_format: str = Form("plain"),
+    chunk_minutes: int = Form(5),
+    model_name: str = Form("base"),
+    vad: bool = Form(VAD_ENABLED),
+    overview: bool = Form(False),
+    deadline_seconds: float = Form(0)
+):
+    """
+    Process an audio file and stream results as Server-Sent Events.
+
+    Starts with a `schedule` event saying which Whisper model is used (see
+    `deadline_seconds` on /process-audio/). Then emits a `transcript` event
+    per chunk, then its `summary` (plain) or `bullets` (bullet) event, and
+    finally a `document` event with the rendered text. Failures are
+    reported as an `error` event. Responds with 429, like /process-audio/,
+    when too many requests are already being processed.
+    """
+    if output_format not in OUTPUT_FORMATS:
+        return JSONResponse(status_code=400, content={"error": OUTPUT_FORMAT_ERROR})
+
+    try:
+        slot = jobs.reserve()
+    except QueueFull:
+        return queue_full_response()
+
+    with tempfile.NamedTemporaryFile(dir=TEMP_DIR, delete=False, suffix=".wav") as temp_audio:
+        temp_audio_path = temp_audio.name
+
+    error = await save_upload(file, temp_audio_path)
+    if error:
+        slot.release()
+        remove_file(temp_audio_path)
+        return JSONResponse(status_code=400, content=error)
+
+    schedule = await run_in_threadpool(
+        scheduler.plan, temp_audio_path, model_name, deadline_seconds or None, jobs.backlog_seconds()
+    )
+    slot.start(scheduler.run_seconds(schedule))
+
+    recording_id, name = uuid.uuid4().hex, file.filename
+
+    # Sync generator: Starlette iterates it in the threadpool, off the event loop
+    def events():
+        metrics.requests_in_flight.inc(endpoint="process-audio-stream")
+        entries = []
+        try:
+            yield sse_event("schedule", schedule)
+            for event, data in iter_process_audio(
+                temp_audio_path, output_format, chunk_minutes, schedule["model"],
+                output_dir=job_output_dir(recording_id), cache=result_cache,
+                vad=vad, overview=overview
+            ):
+                if event in ("summary", "bullets"):
+                    entries.append(data)
+                elif event == "document":
+                    index_result(recording_id, name, {"entries": entries}, chunk_minutes, model=schedule["model"])
+                yield sse_event(event, data)
+        except Exception as e:
+            yield sse_event("error", {"error": f"Processing failed: {str(e)}"})
+        finally:
+            slot.release()
+            metrics.requests_in_flight.dec(endpoint="process-audio-stream")
+            remove_file(temp_audio_path)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        # Also frees the slot if the client left before the stream started
+        background=BackgroundTask(slot.release),
+    )
+
+# Live recording: PCM frames in, partial transcripts and summaries out
+@app.websocket("/ws/record")
+async def live_record(websocket: WebSocket):
+    """
+    Live transcription over a WebSocket.
+
+    1. Client sends a JSON start message: {"type": "start", "sample_rate": 48000,
+       "encoding": "f32le" | "s16le", "output_format": "plain" | "bullet" | "extractive" | "extractive_bullet",
+       "model_name": "base", "overview": false}
+    2. Client streams mono PCM as binary frames. Each completed window is
+       transcribed and summarized while recording continues, and pushed back
+       as {"type": "transcript", ...} and {"type": "summary" | "bullets", ...}.
+    3. Client sends {"type": "stop"}; the server flushes the last partial
+       window and replies with {"type": "document", "filename", "text"}.
+    """
+    await websocket.accept()
+
+    try:
+        config = await websocket.receive_json()
+        session = LiveSession(
+            int(config.get("sample_rate", 48000)),
+            output_format=config.get("output_format", "plain"),
+            model_name=config.get("model_name", "base"),
+        )
+    except (ValueError, TypeError) as e:
+        await websocket.send_json({"type": "error", "error": f"Invalid start message: {str(e)}"})
+        await websocket.close()
+        return
+
+    encoding = config.get("encoding", "f32le")
+    wake = asyncio.Event()
+    stopping = failed = False
+
+    async def send_events(events):
+        for event, data in events:
+            await websocket.send_json({"type": event, **data})
+
+    # Transcribe completed windows in the threadpool while frames keep arriving
+    async def process_windows():
+        nonlocal failed
+        while not stopping:
+            await wake.wait()
+            wake.clear()
+            try:
+                events = await run_in_threadpool(session.process_ready)
+            except Exception as e:
+                # End the session now; otherwise later windows would silently pile up and be dropped
+                failed = True
+                await websocket.send_json({"type": "error", "error": f"Processing failed: {str(e)}"})
+                await websocket.close(code=1011)
+                return
+            await send_events(events)
+
+    worker = asyncio.create_task(process_windows())
+    reported_drop = 0
+    metrics.requests_in_flight.inc(endpoint="ws-record")
+    try:
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                raise WebSocketDisconnect()
+            if failed:
+                return
+
+            if message.get("bytes"):
+                session.feed(to_float32(message["bytes"], encoding))
+                if session.ready():
+                    wake.set()
+                if session.buffer.dropped > reported_drop:
+                    reported_drop = session.buffer.dropped
+                    await websocket.send_json({"type": "warning", "dropped_seconds": session.dropped_seconds})
+            elif message.get("text") and json.loads(message["text"]).get("type") == "stop":
+                break
+
+        # Let the window worker finish, then flush what's left and render
+        stopping = True
+        wake.set()
+        await worker
+        if failed:
+            return
+        await send_events(await run_in_threadpool(session.finish, bool(config.get("overview", False))))
+        await websocket.close()
+
+    except WebSocketDisconnect:
+        worker.cancel()
+    except Exception as e:
+        worker.cancel()
+        await websocket.send_json({"type": "error", "error": f"Processing failed: {str(e)}"})
+        await websocket.close()
+    finally:
+        metrics.requests_in_flight.dec(endpoint="ws-record")
+
+# Resumable uploads: create, send bytes by offset (resume with HEAD), then process
+def upload_headers(status):
+    return {
+        "Upload-Offset": str(status["offset"]),
+        "Upload-Length": str(status["length"]),
+        "Cache-Control": "no-store",
+    }
+
+def upload_error(e):
+    return JSONResponse(status_code=e.status, content={"error": str(e)})
+
+@app.post("/uploads/", status_code=201)
+async def create_upload(
+    upload_length: int = Header(..., alias="Upload-Length"),
+    filename: str = Header(None, alias="Upload-Filename"),
+    content_type: str = Header("application/octet-stream", alias="Content-Type"),
+):
+    """
+    Start a resumable upload of `Upload-Length` bytes.
+
+    Send the bytes with PATCH /uploads/{id} and an `Upload-Offset` header.
+    After a dropped connection, HEAD /uploads/{id} returns the offset to
+    resume from. Processing can be started before the upload completes.
+    """
+    try:
+        status = uploads.create(upload_length, filename=filename, content_type=content_type)
+    except UploadError as e:
+        return upload_error(e)
+
+    return JSONResponse(
+        status_code=201,
+        content={
+            "upload_id": status["id"],
+            "upload_url": f"/uploads/{status['id']}",
+            "offset": status["offset"],
+            "max_bytes": uploads.max_bytes,
+        },
+        headers=dict(upload_headers(status), Location=f"/uploads/{status['id']}"),
+    )
+
+@app.head("/uploads/{upload_id}")
+async def upload_offset(upload_id: str):
+    try:
+        status = uploads.status(upload_id)
+    except UploadError as e:
+        return Response(status_code=e.status)
+    return Response(status_code=200, headers=upload_headers(status))
+
+@app.get("/uploads/{upload_id}")
+async def upload_status(upload_id: str):
+    try:
+        status = uploads.status(upload_id)
+    except UploadError as e:
+        return upload_error(e)
+    return JSONResponse(content=status, headers=upload_headers(status))
+
+@app.patch("/uploads/{upload_id}")
+async def append_upload(request: Request, upload_id: str, upload_offset: int = Header(..., alias="Upload-Offset")):
+    """Append the request body at `Upload-Offset`; the body is streamed straight to disk."""
+    try:
+        status = await uploads.append(upload_id, upload_offset, request.stream())
+    except UploadError as e:
+        return upload_error(e)
+    return Response(status_code=204, headers=upload_headers(status))
+
+@app.delete("/uploads/{upload_id}", status_code=204)
+async def delete_upload(upload_id: str):
+    uploads.delete(upload_id)
+    return Response(status_code=204)
+
+@app.post("/uploads/{upload_id}/process", status_code=202)
+async def process_upload(
+    upload_id: str,
+    output_format: str = Form("plain"),
+    chunk_minutes: int = Form(5),
+    model_name: str = Form("base"),
+    workers: int = Form(0),
+    vad: bool = Form(VAD_ENABLED),
+    overview: bool = Form(False)
+):
+    """
+    Queue a (possibly still incomplete) upload as a job.
+
+    If the upload is still arriving, decoding starts on the received bytes
+    and follows the upload as it grows. This works for streamable formats
+    (WAV, MP3, OGG, FLAC); containers that keep their index at the end
+    (most M4A/MP4) need the upload to finish first. The upload is removed
+    once the job ends.
+    """
+    if output_format not in OUTPUT_FORMATS:
+        return JSONResponse(status_code=400, content={"error": OUTPUT_FORMAT_ERROR})
+
+    try:
+        status = uploads.status(upload_id)
+    except UploadError as e:
+        return upload_error(e)
+
+    if status["complete"]:
+        source, cache = uploads.path(upload_id), result_cache
+    else:
+        # Still arriving: follow the file; it can't be hashed for the cache yet
+        source, cache = uploads.open_reader(upload_id), None
+
+    def cleanup():
+        if not status["complete"]:
+            source.close()
+        uploads.delete(upload_id)
+
+    job_id = uuid.uuid4().hex
+
+    def run_upload():
+        result = process_audio(
+            source, output_format, chunk_minutes, model_name, workers,
+            output_dir=job_output_dir(job_id), cache=cache, vad=vad, overview=overview,
+        )
+        index_result(job_id, status["filename"], result, chunk_minutes, model=model_name)
+        return result
+
+    params = {
+        "upload_id": upload_id,
+        "output_format": output_format,
+        "chunk_minutes": chunk_minutes,
+        "model_name": model_name,
+        "vad": vad,
+        "overview": overview,
+    }
+    try:
+        jobs.submit(run_upload, job_id=job_id, params=params, cleanup=cleanup)
+    except QueueFull:
+        if not status["complete"]:
+            source.close()
+        return queue_full_response()
+
+    return queued_response(job_id)
+
+# Asynchronous jobs: submit returns immediately, poll status, then fetch the result
+@app.post("/jobs/", status_code=202)
+async def submit_job(
+    file: UploadFile = File(None),
+    output_format: str = Form("plain"),
+    chunk_minutes: int = Form(5),
+    model_name: str = Form("base"),
+    workers: int = Form(0),
+    vad: bool = Form(VAD_ENABLED),
+    overview: bool = Form(False),
+    deadline_seconds: float = Form(0)
+):
+    """
+    Queue an audio file for processing and return a job id right away.
+
+    With `deadline_seconds` the Whisper model is downgraded when the queue
+    wait plus the estimated run time would miss it; the returned
+    `schedule` (also in the job status) says which model will be used.
+    Responds with 429 when the job queue is full.
+    """
+    if output_format not in OUTPUT_FORMATS:
+        return JSONResponse(status_code=400, content={"error": OUTPUT_FORMAT_ERROR})
+
+    with tempfile.NamedTemporaryFile(dir=TEMP_DIR, delete=False, suffix=".wav") as temp_audio:
+        temp_audio_path = temp_audio.name
+
+    error = await save_upload(file, temp_audio_path)
+    if error:
+        remove_file(temp_audio_path)
+        return JSONResponse(status_code=400, content=error)
+
+    schedule = await run_in_threadpool(
+        scheduler.plan, temp_audio_path, model_name, deadline_seconds or None, jobs.backlog_seconds()
+    )
+    params = {
+        "output_format": output_format,
+        "chunk_minutes": chunk_minutes,
+        "model_name": model_name,
+        "vad": vad,
+        "overview": overview,
+        "schedule": schedule,
+    }
+    run = {
+        "name": file.filename,
+        "output_format": output_format,
+        "chunk_minutes": chunk_minutes,
+        "model_name": schedule["model"],
+        "workers": workers,
+        "vad": vad,
+        "overview": overview,
+    }
+    job_id = uuid.uuid4().hex
+    if transcript_store is not None:
+        # Recorded before it is queued, so a crash from here on can't lose it
+        await run_in_threadpool(transcript_store.create, job_id, temp_audio_path, run, params)
+    try:
+        queue_job(job_id, temp_audio_path, run, params, estimate=scheduler.run_seconds(schedule))
+    except QueueFull:
+        if transcript_store is not None:
+            transcript_store.fail(job_id, "Job queue was full")
+        remove_file(temp_audio_path)
+        return queue_full_response()
+
+    return queued_response(job_id, schedule=schedule)
+
+# Batch: many files, one job; chunks from all files share one transcription queue
+@app.post("/batch/", status_code=202)
+async def submit_batch(
+    files: List[UploadFile] = File(...),
+    output_format: str = Form("plain"),
+    chunk_minutes: int = Form(5),
+    model_name: str = Form("base"),
+    workers: int = Form(0),
+    vad: bool = Form(VAD_ENABLED),
+    overview: bool = Form(False)
+):
+    """
+    Queue several audio files as one batch job.
+
+    The result (GET /jobs/{job_id}/result) is JSON with one entry per file,
+    in upload order: its name and rendered text, or the error it hit.
+    """
+    if output_format not in OUTPUT_FORMATS:
+        return JSONResponse(status_code=400, content={"error": OUTPUT_FORMAT_ERROR})
+
+    paths, names = [], []
+    for file in files:
+        with tempfile.NamedTemporaryFile(dir=TEMP_DIR, delete=False, suffix=".wav") as temp_audio:
+            paths.append(temp_audio.name)
+        names.append(file.filename)
+        error = await save_upload(file, paths[-1])
+        if error:
+            for path in paths:
+                remove_file(path)
+            return JSONResponse(status_code=400, content=dict(error, file=file.filename))
+
+    job_id = uuid.uuid4().hex
+
+    def run_batch():
+        results = process_batch(
+            paths, output_format, chunk_minutes, model_name, workers,
+            output_dir=job_output_dir(job_id), cache=result_cache, vad=vad, overview=overview
+        )
+        for r in results:
+            index_result(f"{job_id}-{r['index']}", names[r["index"]], r, chunk_minutes, model=model_name)
+        return {"files": [
+            {"name": names[r["index"]], "filename": r.get("filename"), "text": r.get("text"), "error": r.get("error")}
+            for r in results
+        ]}
+
+    def cleanup():
+        for path in paths:
+            remove_file(path)
+
+    params = {
+        "files": names,
+        "output_format": output_format,
+        "chunk_minutes": chunk_minutes,
+        "model_name": model_name,
+        "vad": vad,
+        "overview": overview,
+    }
+    try:
+        jobs.submit(run_batch, job_id=job_id, params=params, cleanup=cleanup)
+    except QueueFull:
+        cleanup()
+        return queue_full_response()
+
+    return queued_response(job_id)
+
+@app.get("/jobs/{job_id}")
+async def job_status(job_id: str):
+    job = jobs.get(job_id) or await run_in_threadpool(stored_job, job_id)
+    if not job:
+        return JSONResponse(status_code=404, content={"error": "Job not found"})
+
+    return {
+        "job_id": job_id,
+        "status": job["status"],
+        "queue_position": jobs.position(job_id),
+        "params": job["params"],
+        "model_used": job["params"].get("schedule", {}).get("model"),
+        "created_at": job["created_at"],
+        "started_at": job["started_at"],
+        "finished_at": job["finished_at"],
+        "error": job["error"],
+    }
+
+@app.get("/jobs/{job_id}/result")
+async def job_result(job_id: str):
+    job = jobs.get(job_id) or await run_in_threadpool(stored_job, job_id)
+    if not job:
+        return JSONResponse(status_code=404, content={"error": "Job not found"})
+    if job["status"] == "failed":
+        return JSONResponse(status_code=500, content={"error": f"Processing failed: {job['error']}"})
+    if job["status"] != "done":
+        return JSONResponse(status_code=202, content={"job_id": job_id, "status": job["status"]})
+
+    # Batch jobs hold one result per file
+    if "files" in job["result"]:
+        return job["result"]
+    return text_file_response(job["result"], job["params"].get("schedule"))
+
+# Full-text search over past transcripts: recordings, chunks and minute ranges that match
+@app.get("/search")
+async def search_transcripts(q: str, limit: int = 20):
+    if search_index is None:
+        return JSONResponse(status_code=404, content={"error": "Search index is disabled"})
+
+    start = time.perf_counter()
+    recordings = await run_in_threadpool(search_index.search, q, max(1, min(limit, 100)))
+    return {
+        "query": q,
+        "took_ms": round((time.perf_counter() - start) * 1000, 2),
+        "recordings": recordings,
+    }
+
+# Transcripts and summaries saved so far, oldest first; pass the last `seq` as `after` to poll
+@app.get("/jobs/{job_id}/chunks")
+async def job_chunks(job_id: str, after: int = 0, limit: int = 500):
+    if transcript_store is None:
+        return JSONResponse(status_code=404, content={"error": "Transcript store is disabled"})
+    job = await run_in_threadpool(transcript_store.get, job_id)
+    if job is None:
+        return JSONResponse(status_code=404, content={"error": "Job not found"})
+
+    rows = await run_in_threadpool(transcript_store.chunks, job_id, after, limit)
+    return {
+        "job_id": job_id,
+        "status": job["status"],
+        "chunks": rows,
+        "next": rows[-1]["seq"] if rows else after,
+    }
+
+# Run a failed job again; chunks it already finished are not redone
+@app.post("/jobs/{job_id}/resume", status_code=202)
+async def resume_job(job_id: str):
+    if transcript_store is None:
+        return JSONResponse(status_code=404, content={"error": "Transcript store is disabled"})
+    job = await run_in_threadpool(transcript_store.get, job_id)
+    if job is None:
+        return JSONResponse(status_code=404, content={"error": "Job not found"})
+    if job["status"] != "failed":
+        return JSONResponse(status_code=409, content={"error": f"Job is {job['status']}, only failed jobs can resume"})
+    if not job["audio_path"] or not os.path.exists(job["audio_path"]):
+        return JSONResponse(status_code=410, content={"error": "Audio is no longer available"})
+    if not await run_in_threadpool(transcript_store.requeue, job_id):
+        return JSONResponse(status_code=409, content={"error": "Job was already resumed"})
+
+    try:
+        queue_job(job_id, job["audio_path"], job["run"], job["params"])
+    except QueueFull:
+        transcript_store.fail(job_id, "Job queue was full")
+        return queue_full_response()
+
+    return queued_response(job_id)
+
+@app.get("/jobs")
+async def job_queue_stats():
+    return dict(jobs.stats(), backlog_seconds=round(jobs.backlog_seconds(), 2))
+
+# Measured real-time factors the deadline scheduler works from
+@app.get("/scheduler")
+async def scheduler_stats():
+    return scheduler.stats()
 
 # Serve the frontend HTML file
 @app.get("/app")
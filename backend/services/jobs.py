@@ -0,0 +1,185 @@
+"""
+Background job queue for long-running audio processing.
+
+Requests submit work and get a job id back immediately. A fixed number of
+worker threads run the pipeline off the event loop, and the queue is bounded
+so callers get backpressure (QueueFull) instead of an ever-growing backlog.
+Requests that run the pipeline themselves (/process-audio/ and its SSE
+variant) take a slot with `reserve`, bounded by the same queue size.
+"""
+
+import os
+import queue
+import threading
+import time
+import traceback
+import uuid
+from collections import OrderedDict
+
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", 1))
+JOB_QUEUE_SIZE = int(os.getenv("JOB_QUEUE_SIZE", 8))
+JOB_HISTORY = int(os.getenv("JOB_HISTORY", 200))  # finished jobs kept for status lookups
+
+QueueFull = queue.Full
+
+
+class Reservation:
+    """
+    A slot from `JobManager.reserve`. `release` frees it; calling it more
+    than once is harmless.
+    """
+
+    def __init__(self, manager):
+        self._manager = manager
+        self._released = threading.Lock()
+        self.estimate = None
+        self.started_at = None
+
+    def start(self, estimate):
+        """Record that the run starts now and should take `estimate` seconds."""
+        with self._manager._lock:
+            self.estimate, self.started_at = estimate, time.time()
+
+    def release(self):
+        if self._released.acquire(blocking=False):
+            with self._manager._lock:
+                self._manager._inline.discard(self)
+
+
+class JobManager:
+    def __init__(self, workers=JOB_WORKERS, queue_size=JOB_QUEUE_SIZE, history=JOB_HISTORY):
+        self.workers = workers
+        self.history = history
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+        self._threads = []
+        self._inline = set()  # pipelines run by request handlers rather than job workers
+
+    def _start(self):
+        if self._threads:
+            return
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._worker, name=f"job-worker-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def submit(self, fn, *args, job_id=None, params=None, cleanup=None, estimate=None, **kwargs):
+        """
+        Queue `fn(*args, **kwargs)` and return the job id.
+
+        Raises QueueFull when the queue is at capacity. `cleanup` runs after
+        the job finishes, whether it succeeded or not. `estimate` is the
+        expected run time in seconds, used by `backlog_seconds`.
+        """
+        job_id = job_id or uuid.uuid4().hex
+        job = {
+            "id": job_id,
+            "status": "queued",
+            "params": params or {},
+            "created_at": time.time(),
+            "started_at": None,
+            "finished_at": None,
+            "error": None,
+            "result": None,
+            "estimate": estimate,
+        }
+
+        with self._lock:
+            self._start()
+            self._queue.put_nowait((job_id, fn, args, kwargs, cleanup))
+            self._jobs[job_id] = job
+            self._trim()
+
+        return job_id
+
+    def reserve(self):
+        """
+        Claim a slot for a pipeline the caller runs itself and return its
+        Reservation. Raises QueueFull when JOB_QUEUE_SIZE of them are
+        already running. Once planned, `start(estimate)` on the reservation
+        counts the run in `backlog_seconds` until it is released.
+        """
+        with self._lock:
+            if len(self._inline) >= self._queue.maxsize:
+                raise QueueFull
+            reservation = Reservation(self)
+            self._inline.add(reservation)
+        return reservation
+
+    def _worker(self):
+        while True:
+            job_id, fn, args, kwargs, cleanup = self._queue.get()
+            self._update(job_id, status="running", started_at=time.time())
+            try:
+                result = fn(*args, **kwargs)
+                self._update(job_id, status="done", result=result, finished_at=time.time())
+            except Exception as e:
+                traceback.print_exc()
+                self._update(job_id, status="failed", error=str(e), finished_at=time.time())
+            finally:
+                if cleanup:
+                    cleanup()
+                self._queue.task_done()
+
+    def _update(self, job_id, **fields):
+        with self._lock:
+            if job_id in self._jobs:
+                self._jobs[job_id].update(fields)
+
+    def _trim(self):
+        """Forget the oldest finished jobs once we keep more than `history`."""
+        finished = [job_id for job_id, job in self._jobs.items() if job["status"] in ("done", "failed")]
+        for job_id in finished[:max(0, len(finished) - self.history)]:
+            del self._jobs[job_id]
+
+    def get(self, job_id):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return dict(job) if job else None
+
+    def position(self, job_id):
+        """1-based position among queued jobs, or None once it has started."""
+        with self._lock:
+            queued = [j for j, job in self._jobs.items() if job["status"] == "queued"]
+        return queued.index(job_id) + 1 if job_id in queued else None
+
+    def backlog_seconds(self):
+        """
+        Expected wait before a newly queued job starts: the estimated work
+        still ahead of it, spread over the workers. That includes pipelines
+        running inline under a reservation, which compete for the same
+        machine. Work without an estimate counts as nothing.
+        """
+        now = time.time()
+        with self._lock:
+            remaining = 0.0
+            for job in self._jobs.values():
+                if not job["estimate"]:
+                    continue
+                if job["status"] == "queued":
+                    remaining += job["estimate"]
+                elif job["status"] == "running":
+                    remaining += max(0.0, job["estimate"] - (now - job["started_at"]))
+            for reservation in self._inline:
+                if reservation.estimate:
+                    remaining += max(0.0, reservation.estimate - (now - reservation.started_at))
+        return remaining / max(1, self.workers)
+
+    def stats(self):
+        with self._lock:
+            statuses = [job["status"] for job in self._jobs.values()]
+            inline = len(self._inline)
+        return {
+            "workers": self.workers,
+            "queue_size": self._queue.maxsize,
+            "queued": statuses.count("queued"),
+            "running": statuses.count("running"),
+            "done": statuses.count("done"),
+            "failed": statuses.count("failed"),
+            "inline": inline,
+        }
+
+
+# Shared job manager for this worker process
+jobs = JobManager()
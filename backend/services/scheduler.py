@@ -0,0 +1,118 @@
+"""
+Deadline-aware Whisper model selection.
+
+A request may state a latency target. Before it is queued we estimate
+when it would finish with the requested model: the queue wait, plus the
+audio duration times the model's measured real-time factor (RTF), plus
+summarizing the last chunk. If that misses the deadline we step down the
+model ladder until the estimate fits, or use the smallest model as the
+best we can do. Without a deadline the requested model is always used.
+
+RTFs come from the moving averages kept in src.metrics while chunks are
+transcribed, so they follow the current hardware and load. Models that
+haven't run yet use a prior, scaled by how the measured models compare
+with their priors.
+"""
+
+import os
+from src import metrics
+from src.audio_to_text import probe_duration
+
+# Fastest last; a request is only ever moved towards the end of this list
+MODEL_LADDER = ("large", "medium", "small", "base", "tiny")
+# Rough CPU real-time factors, only used until a model has been measured
+PRIOR_RTF = {"large": 1.6, "medium": 0.8, "small": 0.3, "base": 0.1, "tiny": 0.05}
+PRIOR_SUMMARY_SECONDS = 10.0
+# Aim a bit under the deadline so estimation error doesn't push us over
+DEADLINE_HEADROOM = float(os.getenv("SCHEDULER_DEADLINE_HEADROOM", 0.9))
+
+
+def _ladder_name(model_name):
+    """Map variants like 'large-v3' or 'base.en' onto their ladder rung."""
+    base = model_name.split(".")[0].split("-")[0]
+    return base if base in MODEL_LADDER else None
+
+
+def hardware_factor():
+    """How much slower (> 1) or faster (< 1) measured models run than their priors."""
+    ratios = []
+    for model_name, prior in PRIOR_RTF.items():
+        measured = metrics.average(f"rtf:{model_name}")
+        if measured is not None:
+            ratios.append(measured / prior)
+    return sum(ratios) / len(ratios) if ratios else 1.0
+
+
+def model_rtf(model_name):
+    measured = metrics.average(f"rtf:{model_name}")
+    if measured is not None:
+        return measured
+    prior = PRIOR_RTF.get(_ladder_name(model_name) or "", PRIOR_RTF["large"])
+    return prior * hardware_factor()
+
+
+def estimate_seconds(model_name, audio_seconds, queue_wait=0.0):
+    """Expected time from now until a job on `model_name` is done."""
+    # Summarizing overlaps transcription, except for the last chunk
+    summary_tail = metrics.average("seconds:summarize", PRIOR_SUMMARY_SECONDS)
+    return queue_wait + audio_seconds * model_rtf(model_name) + summary_tail
+
+
+def candidates(model_name):
+    """The requested model, then every faster rung below it."""
+    rung = _ladder_name(model_name)
+    if rung is None:
+        return [model_name]
+    return [model_name] + list(MODEL_LADDER[MODEL_LADDER.index(rung) + 1:])
+
+
+def plan(audio_path, model_name, deadline_seconds=None, queue_wait=0.0):
+    """
+    Pick the Whisper model for a request. Returns a dict describing the
+    decision; `model` is the one to use.
+    """
+    decision = {
+        "requested_model": model_name,
+        "model": model_name,
+        "deadline_seconds": deadline_seconds,
+        "audio_seconds": None,
+        "queue_wait_seconds": round(queue_wait, 2),
+        "estimated_seconds": None,
+        "meets_deadline": None,
+    }
+
+    audio_seconds = probe_duration(audio_path) if isinstance(audio_path, str) else None
+    if audio_seconds is None:
+        # Can't estimate (e.g. an upload still arriving): keep what was asked for
+        return decision
+    decision["audio_seconds"] = round(audio_seconds, 2)
+
+    options = candidates(model_name) if deadline_seconds else [model_name]
+    for option in options:
+        estimate = estimate_seconds(option, audio_seconds, queue_wait)
+        decision.update(model=option, estimated_seconds=round(estimate, 2))
+        if not deadline_seconds or estimate <= deadline_seconds * DEADLINE_HEADROOM:
+            break
+
+    if deadline_seconds:
+        decision["meets_deadline"] = decision["estimated_seconds"] <= deadline_seconds
+        if decision["model"] != model_name:
+            print(f"Scheduler: {model_name} -> {decision['model']} "
+                  f"(est. {decision['estimated_seconds']}s, deadline {deadline_seconds}s)")
+    return decision
+
+
+def run_seconds(decision):
+    """Expected run time from a `plan` decision, without the queue wait; None if unknown."""
+    if decision["estimated_seconds"] is None:
+        return None
+    return max(0.0, decision["estimated_seconds"] - decision["queue_wait_seconds"])
+
+
+def stats():
+    return {
+        "hardware_factor": round(hardware_factor(), 3),
+        "rtf": {name: round(model_rtf(name), 4) for name in MODEL_LADDER},
+        "measured": [name for name in MODEL_LADDER if metrics.average(f"rtf:{name}") is not None],
+        "summary_seconds_per_chunk": round(metrics.average("seconds:summarize", PRIOR_SUMMARY_SECONDS), 3),
+    }
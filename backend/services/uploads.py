@@ -0,0 +1,207 @@
+"""
+Resumable, size-limited uploads.
+
+A client creates an upload with its total length, then sends the bytes in
+any number of requests, each starting at the offset the server already
+has. Bytes are appended straight to the upload's file as they arrive, so
+a dropped connection only loses the request in flight: the client asks
+for the current offset and continues from there.
+
+Readers from `open_reader` follow the file while it grows, which lets the
+pipeline start decoding before the upload has finished.
+"""
+
+import json
+import os
+import threading
+import time
+import uuid
+from fastapi.concurrency import run_in_threadpool
+
+UPLOAD_DIR = os.getenv("UPLOAD_DIR", os.path.join(os.getcwd(), "temp", "uploads"))
+MAX_UPLOAD_MB = int(os.getenv("MAX_UPLOAD_MB", 4096))
+UPLOAD_TTL_HOURS = float(os.getenv("UPLOAD_TTL_HOURS", 24))  # unfinished uploads are removed after this
+UPLOAD_STALL_SECONDS = float(os.getenv("UPLOAD_STALL_SECONDS", 300))  # reader gives up without new bytes
+WRITE_BLOCK_BYTES = 1024 * 1024
+
+
+def _write(f, data):
+    f.write(data)
+    f.flush()
+
+
+class UploadError(Exception):
+    """An upload request the store rejects; `status` is the HTTP status to answer with."""
+
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+class UploadStore:
+    def __init__(self, root=UPLOAD_DIR, max_mb=MAX_UPLOAD_MB, ttl_hours=UPLOAD_TTL_HOURS):
+        self.root = root
+        self.max_bytes = max_mb * 1024 * 1024
+        self.ttl_seconds = ttl_hours * 3600
+        os.makedirs(root, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._writing = set()  # uploads with a request currently appending
+        self._grown = threading.Condition(self._lock)
+
+    # -- helpers --------------------------------------------------------
+
+    def path(self, upload_id):
+        return os.path.join(self.root, f"{upload_id}.part")
+
+    def _meta_path(self, upload_id):
+        return os.path.join(self.root, f"{upload_id}.json")
+
+    def _read_meta(self, upload_id):
+        try:
+            with open(self._meta_path(upload_id), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError):
+            raise UploadError("Upload not found", status=404)
+
+    def _offset(self, upload_id):
+        try:
+            return os.path.getsize(self.path(upload_id))
+        except OSError:
+            return 0
+
+    # -- API ------------------------------------------------------------
+
+    def create(self, length, filename=None, content_type=None):
+        """Start an upload of `length` bytes and return its status."""
+        if length <= 0:
+            raise UploadError("Upload-Length must be positive")
+        if length > self.max_bytes:
+            raise UploadError(f"Upload exceeds the {self.max_bytes // (1024 * 1024)} MB limit", status=413)
+
+        self.expire()
+        upload_id = uuid.uuid4().hex
+        meta = {
+            "id": upload_id,
+            "length": length,
+            "filename": filename,
+            "content_type": content_type,
+            "created_at": time.time(),
+        }
+        open(self.path(upload_id), "wb").close()
+        with open(self._meta_path(upload_id), "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        return self.status(upload_id)
+
+    def status(self, upload_id):
+        meta = self._read_meta(upload_id)
+        offset = self._offset(upload_id)
+        return dict(meta, offset=offset, complete=offset >= meta["length"])
+
+    async def append(self, upload_id, offset, chunks):
+        """
+        Append the async byte iterator `chunks` at `offset`, which must equal
+        the bytes already received. Returns the new status.
+        """
+        meta = await run_in_threadpool(self._read_meta, upload_id)
+        with self._lock:
+            if upload_id in self._writing:
+                raise UploadError("Another request is writing to this upload", status=409)
+            current = self._offset(upload_id)
+            if offset != current:
+                raise UploadError(f"Upload-Offset {offset} does not match current offset {current}", status=409)
+            self._writing.add(upload_id)
+
+        # File I/O runs in worker threads so a large upload doesn't stall the event loop;
+        # body chunks are gathered into WRITE_BLOCK_BYTES writes to keep the thread hops few
+        pending = bytearray()
+
+        async def write_pending():
+            nonlocal current
+            await run_in_threadpool(_write, f, bytes(pending))
+            current += len(pending)
+            pending.clear()
+            with self._grown:
+                self._grown.notify_all()
+
+        try:
+            f = await run_in_threadpool(open, self.path(upload_id), "ab")
+            try:
+                async for chunk in chunks:
+                    if current + len(pending) + len(chunk) > meta["length"]:
+                        raise UploadError("Body goes past the declared Upload-Length", status=413)
+                    pending += chunk
+                    if len(pending) >= WRITE_BLOCK_BYTES:
+                        await write_pending()
+            finally:
+                # Keep what did arrive, so the client can resume after it
+                if pending:
+                    await write_pending()
+                await run_in_threadpool(f.close)
+        finally:
+            with self._grown:
+                self._writing.discard(upload_id)
+                self._grown.notify_all()
+
+        return self.status(upload_id)
+
+    def delete(self, upload_id):
+        for path in (self.path(upload_id), self._meta_path(upload_id)):
+            if os.path.exists(path):
+                os.remove(path)
+        with self._grown:
+            self._grown.notify_all()
+
+    def expire(self):
+        """Remove uploads older than the TTL."""
+        cutoff = time.time() - self.ttl_seconds
+        for name in os.listdir(self.root):
+            if not name.endswith(".json"):
+                continue
+            upload_id = name[:-len(".json")]
+            try:
+                if os.path.getmtime(self.path(upload_id)) < cutoff:
+                    self.delete(upload_id)
+            except OSError:
+                self.delete(upload_id)
+
+    def open_reader(self, upload_id, stall_seconds=UPLOAD_STALL_SECONDS):
+        """File-like reader that blocks until more bytes arrive or the upload completes."""
+        return GrowingReader(self, upload_id, stall_seconds)
+
+
+class GrowingReader:
+    def __init__(self, store, upload_id, stall_seconds=UPLOAD_STALL_SECONDS):
+        self.store = store
+        self.upload_id = upload_id
+        self.stall_seconds = stall_seconds
+        self.length = store._read_meta(upload_id)["length"]
+        self.position = 0
+        self._file = open(store.path(upload_id), "rb")
+
+    def read(self, size=-1):
+        if self.position >= self.length:
+            return b""
+        if size is None or size < 0:
+            size = self.length - self.position
+
+        deadline = time.monotonic() + self.stall_seconds
+        with self.store._grown:
+            while self.store._offset(self.upload_id) <= self.position:
+                if not os.path.exists(self.store._meta_path(self.upload_id)):
+                    raise UploadError("Upload was deleted", status=410)
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise UploadError(f"Upload stalled for {self.stall_seconds:.0f}s", status=408)
+                self.store._grown.wait(timeout=min(remaining, 1.0))
+
+        data = self._file.read(min(size, self.length - self.position))
+        self.position += len(data)
+        return data
+
+    def close(self):
+        self._file.close()
+
+
+# Shared upload store for this worker process
+uploads = UploadStore()
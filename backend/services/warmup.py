@@ -0,0 +1,94 @@
+"""
+Background model warm-up.
+
+Loading Whisper and BART takes tens of seconds, so it must not happen at
+import time or inside a startup hook the server waits on. The models named
+in WARMUP_MODELS load on a daemon thread once the worker is up: /health
+answers right away, and /ready reports 503 until every model has loaded,
+so a load balancer only routes traffic to warm workers.
+
+WARMUP_MODELS is a comma-separated list of Whisper model names and/or
+"summarizer", e.g. "base,summarizer".
+"""
+
+import os
+import threading
+import time
+from src.model_registry import get_whisper_model
+from src import summarizer
+
+SUMMARIZER = "summarizer"
+
+
+def configured_models():
+    models = [name.strip() for name in os.getenv("WARMUP_MODELS", "").split(",") if name.strip()]
+    # Older deployments only set PRELOAD_SUMMARIZER
+    if os.getenv("PRELOAD_SUMMARIZER", "False").lower() == "true" and SUMMARIZER not in models:
+        models.append(SUMMARIZER)
+    return models
+
+
+_lock = threading.Lock()
+_thread = None
+_pending = []
+_loaded = {}
+_errors = {}
+_started_at = None
+
+
+def _load(name):
+    if name == SUMMARIZER:
+        summarizer.warm_up()
+    else:
+        get_whisper_model(name)
+
+
+def _run():
+    while True:
+        with _lock:
+            if not _pending:
+                return
+            name = _pending[0]
+        start = time.perf_counter()
+        try:
+            _load(name)
+        except Exception as e:
+            print(f"⚠️  Warm-up of {name} failed: {e}")
+            with _lock:
+                _errors[name] = str(e)
+        else:
+            with _lock:
+                _loaded[name] = round(time.perf_counter() - start, 3)
+        with _lock:
+            _pending.pop(0)
+
+
+def start(models=None):
+    """Load `models` (default: WARMUP_MODELS) on a background thread. Returns immediately."""
+    global _thread, _started_at
+    models = configured_models() if models is None else models
+    with _lock:
+        if _thread is not None or not models:
+            return
+        _pending.extend(models)
+        _started_at = time.time()
+        _thread = threading.Thread(target=_run, name="model-warmup", daemon=True)
+    _thread.start()
+    print(f"Warming up {', '.join(models)} in the background")
+
+
+def ready():
+    """True once every configured model has loaded. A failed load keeps the worker unready."""
+    with _lock:
+        return not _pending and not _errors
+
+
+def status():
+    with _lock:
+        return {
+            "ready": not _pending and not _errors,
+            "pending": list(_pending),
+            "loaded": dict(_loaded),
+            "errors": dict(_errors),
+            "started_at": _started_at,
+        }
@@ -0,0 +1,232 @@
+"""
+Per-stage benchmark of the audio-to-summary pipeline.
+
+Runs each stage on its own (decode, chunk, transcribe, summarize, bullets,
+render) for every combination of the swept parameters and writes a JSON
+report with wall time, real-time factor, throughput and peak RSS per stage.
+
+    python -m benchmarks.bench_pipeline --audio uploads/test.wav uploads/test.mp3 \
+        --models tiny base --chunk-minutes 1 5 --batch-sizes 1 4 --workers 1 2 \
+        --output dataset/benchmarks/report.json
+
+Real-time factor is stage wall time divided by audio duration, so lower is
+better and < 1 means faster than real time.
+"""
+
+import argparse
+import itertools
+import json
+import os
+import platform
+import resource
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timezone
+
+from src.audio_to_text import SAMPLE_RATE, decode_blocks, chunk_audio, transcribe_chunks, save_dataset, build_dataset
+from src.model_registry import get_whisper_model
+from src.parallel_transcribe import shutdown_pool
+from src.summarizer import SUMMARIZER_MODEL, get_summarizer, is_loaded
+from src.summarize import summarize_existing_dataset
+from src.bullet_text import text_to_bullets
+from src.extractive import extractive_entries
+from src.decorators import json_to_text
+from src.bullet_to_text import json_bullets_to_text
+
+DEFAULT_AUDIO = [os.path.join("uploads", "test.wav"), os.path.join("uploads", "test.mp3")]
+SAMPLE_SECONDS = 0.05
+
+
+def _rss_bytes():
+    """Current resident set size of this process."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        # No procfs: fall back to the lifetime peak
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+
+
+class PeakRSS:
+    """Sample RSS in the background while a stage runs and keep the maximum."""
+
+    def __init__(self, interval=SAMPLE_SECONDS):
+        self.interval = interval
+        self.peak = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+
+    def _sample(self):
+        while True:
+            self.peak = max(self.peak, _rss_bytes())
+            if self._stop.wait(self.interval):
+                break
+
+    def __enter__(self):
+        self.peak = _rss_bytes()
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self.peak = max(self.peak, _rss_bytes())
+
+
+def measure(stage, fn, audio_seconds, items=None, **params):
+    """
+    Run `fn` once and return (its result, the stage measurement).
+    With `audio_seconds=None` the stage itself returns the duration.
+    """
+    with PeakRSS() as rss:
+        start = time.perf_counter()
+        result = fn()
+        wall = time.perf_counter() - start
+
+    if audio_seconds is None:
+        audio_seconds = result
+
+    count = items(result) if items else None
+    record = {
+        "stage": stage,
+        **params,
+        "wall_seconds": round(wall, 4),
+        "rtf": round(wall / audio_seconds, 4) if audio_seconds else None,
+        "audio_seconds_per_second": round(audio_seconds / wall, 2) if wall else None,
+        "items": count,
+        "items_per_second": round(count / wall, 3) if count and wall else None,
+        "peak_rss_mb": round(rss.peak / (1024 * 1024), 1),
+    }
+    print(f"  {stage:<10} {wall:8.2f}s  rtf={record['rtf']}  peak={record['peak_rss_mb']} MB")
+    return result, record
+
+
+def decode_seconds(audio_path):
+    """Decode the whole file once; returns its duration in seconds."""
+    samples = sum(len(block) for block in decode_blocks(audio_path, 60 * SAMPLE_RATE))
+    return samples / SAMPLE_RATE
+
+
+def render(summary_file, bullets_file):
+    with open(summary_file, "r", encoding="utf-8") as f:
+        summary = json_to_text(json.load(f))
+    with open(bullets_file, "r", encoding="utf-8") as f:
+        bullets = json_bullets_to_text(json.load(f))
+    return [summary, bullets]
+
+
+def bench_file(audio_path, args, work_dir):
+    print(f"\n{audio_path}")
+    audio_seconds, record = measure("decode", lambda: decode_seconds(audio_path), None)
+    records = [record]
+    summarizer_loaded = is_loaded()
+
+    for chunk_minutes in args.chunk_minutes:
+        chunk_dir = os.path.join(work_dir, f"chunks_{chunk_minutes}m")
+        chunks, record = measure(
+            "chunk", lambda: chunk_audio(audio_path, chunk_dir, chunk_minutes=chunk_minutes),
+            audio_seconds, items=len, chunk_minutes=chunk_minutes,
+        )
+        records.append(record)
+
+        for model_name, workers in itertools.product(args.models, args.workers):
+            params = {"chunk_minutes": chunk_minutes, "model": model_name, "workers": workers}
+            if workers <= 1:
+                # Keep model loading out of the transcribe numbers
+                _, record = measure("load", lambda: get_whisper_model(model_name), audio_seconds, **params)
+                records.append(record)
+
+            transcripts, record = measure(
+                "transcribe", lambda: transcribe_chunks(chunks, model_name=model_name, workers=workers),
+                audio_seconds, items=len, **params,
+            )
+            records.append(record)
+            if workers > 1:
+                shutdown_pool()
+
+            if not summarizer_loaded:
+                _, record = measure("load", get_summarizer, audio_seconds, model=SUMMARIZER_MODEL)
+                records.append(record)
+                summarizer_loaded = True
+
+            dataset_file = os.path.join(work_dir, "dataset.json")
+            save_dataset(transcripts, dataset_file)
+
+            # NumPy extractive summaries, for comparison with the BART stages below
+            _, record = measure(
+                "extractive", lambda: extractive_entries(build_dataset(transcripts), chunk_minutes),
+                audio_seconds, items=len, chunk_minutes=chunk_minutes, model=model_name,
+            )
+            records.append(record)
+
+            for batch_size in args.batch_sizes:
+                params["batch_size"] = batch_size
+                summary_file = os.path.join(work_dir, "summary.json")
+                bullets_file = os.path.join(work_dir, "bullets.json")
+
+                _, record = measure(
+                    "summarize",
+                    lambda: summarize_existing_dataset(dataset_file, summary_file, chunk_minutes, batch_size),
+                    audio_seconds, items=lambda _: len(transcripts), **params,
+                )
+                records.append(record)
+
+                _, record = measure(
+                    "bullets",
+                    lambda: text_to_bullets(dataset_file, bullets_file, chunk_minutes, batch_size),
+                    audio_seconds, items=lambda _: len(transcripts), **params,
+                )
+                records.append(record)
+
+                _, record = measure("render", lambda: render(summary_file, bullets_file), audio_seconds, **params)
+                records.append(record)
+
+        shutil.rmtree(chunk_dir, ignore_errors=True)
+
+    return {"audio": audio_path, "audio_seconds": round(audio_seconds, 2), "stages": records}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark each pipeline stage.")
+    parser.add_argument("--audio", nargs="+", default=DEFAULT_AUDIO)
+    parser.add_argument("--models", nargs="+", default=["base"])
+    parser.add_argument("--chunk-minutes", nargs="+", type=float, default=[5])
+    parser.add_argument("--batch-sizes", nargs="+", type=int, default=[4])
+    parser.add_argument("--workers", nargs="+", type=int, default=[1])
+    parser.add_argument("--output", default=os.path.join("dataset", "benchmarks", "report.json"))
+    args = parser.parse_args(argv)
+
+    work_dir = tempfile.mkdtemp(prefix="bench_")
+    try:
+        runs = [bench_file(path, args, work_dir) for path in args.audio]
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    report = {
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "host": {
+            "platform": platform.platform(),
+            "python": platform.python_version(),
+            "cpu_count": os.cpu_count(),
+        },
+        "sweep": {
+            "models": args.models,
+            "chunk_minutes": args.chunk_minutes,
+            "batch_sizes": args.batch_sizes,
+            "workers": args.workers,
+        },
+        "runs": runs,
+    }
+
+    os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nReport saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
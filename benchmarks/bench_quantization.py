@@ -0,0 +1,147 @@
+"""
+fp32 vs dynamic int8: speed, memory and output drift on CPU.
+
+For each Whisper model, and for the BART summarizer, the fp32 and int8
+versions run on the same input. The report has load and inference time,
+model size, peak RSS and the word error rate of the int8 output measured
+against the fp32 output (0 = identical text).
+
+    python -m benchmarks.bench_quantization --audio uploads/test.wav --models tiny base
+"""
+
+import argparse
+import gc
+import json
+import os
+import platform
+from datetime import datetime, timezone
+
+import numpy as np
+import torch
+import whisper
+
+from benchmarks.bench_pipeline import measure
+from src.audio_to_text import SAMPLE_RATE, decode_blocks
+from src.model_registry import model_size_bytes
+from src.quantize import load_quantized
+from src.summarizer import SUMMARIZER_MODEL, build_summarizer
+
+VARIANTS = ("fp32", "int8")
+
+
+def word_error_rate(reference, hypothesis):
+    """Word-level edit distance between two texts, divided by the reference length."""
+    ref, hyp = reference.lower().split(), hypothesis.lower().split()
+    if not ref:
+        return 0.0 if not hyp else 1.0
+
+    previous = list(range(len(hyp) + 1))
+    for i, ref_word in enumerate(ref, start=1):
+        current = [i] + [0] * len(hyp)
+        for j, hyp_word in enumerate(hyp, start=1):
+            current[j] = min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (ref_word != hyp_word),
+            )
+        previous = current
+    return previous[-1] / len(ref)
+
+
+def load_whisper(model_name, variant):
+    if variant == "int8":
+        return load_quantized(f"whisper-{model_name}", lambda: whisper.load_model(model_name, device="cpu"))
+    return whisper.load_model(model_name, device="cpu")
+
+
+def bench_whisper(model_name, audio, audio_seconds):
+    records, texts = [], {}
+    for variant in VARIANTS:
+        params = {"model": f"whisper-{model_name}", "variant": variant}
+        model, record = measure("load", lambda: load_whisper(model_name, variant), audio_seconds, **params)
+        record["model_mb"] = round(model_size_bytes(model) / (1024 * 1024), 1)
+        records.append(record)
+
+        result, record = measure(
+            "transcribe", lambda: model.transcribe(audio, fp16=False), audio_seconds, **params
+        )
+        texts[variant] = result["text"].strip()
+        records.append(record)
+
+        del model
+        gc.collect()
+
+    drift = word_error_rate(texts["fp32"], texts["int8"])
+    return {"model": f"whisper-{model_name}", "stages": records, "texts": texts, "wer_vs_fp32": round(drift, 4)}
+
+
+def bench_summarizer(text, audio_seconds):
+    records, summaries = [], {}
+    for variant in VARIANTS:
+        params = {"model": SUMMARIZER_MODEL, "variant": variant}
+        summarizer, record = measure(
+            "load", lambda: build_summarizer(quantize=variant == "int8"), audio_seconds, **params
+        )
+        record["model_mb"] = round(model_size_bytes(summarizer.model) / (1024 * 1024), 1)
+        records.append(record)
+
+        output, record = measure(
+            "summarize",
+            lambda: summarizer(text, max_length=80, min_length=20, do_sample=False, truncation=True),
+            audio_seconds, **params,
+        )
+        summaries[variant] = output[0]["summary_text"]
+        records.append(record)
+
+        del summarizer
+        gc.collect()
+
+    drift = word_error_rate(summaries["fp32"], summaries["int8"])
+    return {"model": SUMMARIZER_MODEL, "stages": records, "texts": summaries, "wer_vs_fp32": round(drift, 4)}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare fp32 and int8 models on CPU.")
+    parser.add_argument("--audio", default=os.path.join("uploads", "test.wav"))
+    parser.add_argument("--models", nargs="+", default=["tiny", "base"])
+    parser.add_argument("--skip-summarizer", action="store_true")
+    parser.add_argument("--output", default=os.path.join("dataset", "benchmarks", "quantization.json"))
+    args = parser.parse_args(argv)
+
+    audio = np.concatenate(list(decode_blocks(args.audio, 60 * SAMPLE_RATE)))
+    audio_seconds = len(audio) / SAMPLE_RATE
+    print(f"{args.audio}: {audio_seconds:.1f}s of audio")
+
+    runs = []
+    for model_name in args.models:
+        print(f"\nwhisper-{model_name}")
+        runs.append(bench_whisper(model_name, audio, audio_seconds))
+
+    if not args.skip_summarizer:
+        # Summarize what the first fp32 model heard, so the input is real speech
+        transcript = runs[0]["texts"]["fp32"] if runs else ""
+        print(f"\n{SUMMARIZER_MODEL}")
+        runs.append(bench_summarizer(transcript, audio_seconds))
+
+    report = {
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "host": {
+            "platform": platform.platform(),
+            "python": platform.python_version(),
+            "torch": torch.__version__,
+            "cpu_count": os.cpu_count(),
+            "torch_threads": torch.get_num_threads(),
+        },
+        "audio": args.audio,
+        "audio_seconds": round(audio_seconds, 2),
+        "runs": runs,
+    }
+
+    os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    print(f"\nReport saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,8 @@
 import uvicorn
 import os
 import sys
+from src import resources
+from src.parallel_transcribe import DEFAULT_WORKERS
 
 def main():
     """
@@ -14,11 +16,21 @@ def main():
     port = int(os.getenv("PORT", 8000))
     reload = os.getenv("RELOAD", "True").lower() == "true"
     log_level = os.getenv("LOG_LEVEL", "info")
+    workers = resources.web_workers()  # WORKERS, or 1 with reload
     
     print(f"🌐 Host: {host}")
     print(f"🔌 Port: {port}")
     print(f"🔄 Reload: {reload}")
     print(f"📝 Log Level: {log_level}")
+    print(f"👷 Workers: {workers}")
+    print("=" * 50)
+    
+    # CPU allocation: one slot per worker, split with its transcription pool
+    print(f"🧮 CPU allocation ({len(resources.available_cores())} cores, "
+          f"affinity {'on' if resources.CPU_AFFINITY else 'off'}):")
+    for i, slot in enumerate(resources.plan(pool_workers=DEFAULT_WORKERS, workers=workers)):
+        pool = f", pool {len(slot['pool'])} x {slot['pool'][0]} threads" if slot["pool"] else ""
+        print(f"   - worker {i + 1}: cores {slot['cores']}, {slot['threads']} torch threads{pool}")
     print("=" * 50)
     
     # CORS origins info
@@ -33,7 +45,26 @@ def main():
     print("🚀 Available endpoints:")
     print(f"   - GET  http://{host}:{port}/")
     print(f"   - GET  http://{host}:{port}/health") 
+    print(f"   - GET  http://{host}:{port}/ready")
+    print(f"   - GET  http://{host}:{port}/models")
+    print(f"   - GET  http://{host}:{port}/cache")
+    print(f"   - GET  http://{host}:{port}/metrics")
+    print(f"   - GET  http://{host}:{port}/resources")
+    print(f"   - GET  http://{host}:{port}/scheduler")
+    print(f"   - GET  http://{host}:{port}/search?q=...")
     print(f"   - POST http://{host}:{port}/process-audio/")
+    print(f"   - POST http://{host}:{port}/process-audio/stream")
+    print(f"   - WS   ws://{host}:{port}/ws/record")
+    print(f"   - POST http://{host}:{port}/uploads/")
+    print(f"   - PATCH http://{host}:{port}/uploads/{{upload_id}}")
+    print(f"   - HEAD http://{host}:{port}/uploads/{{upload_id}}")
+    print(f"   - POST http://{host}:{port}/uploads/{{upload_id}}/process")
+    print(f"   - POST http://{host}:{port}/jobs/")
+    print(f"   - POST http://{host}:{port}/batch/")
+    print(f"   - GET  http://{host}:{port}/jobs/{{job_id}}")
+    print(f"   - GET  http://{host}:{port}/jobs/{{job_id}}/result")
+    print(f"   - GET  http://{host}:{port}/jobs/{{job_id}}/chunks")
+    print(f"   - POST http://{host}:{port}/jobs/{{job_id}}/resume")
     print(f"   - GET  http://{host}:{port}/docs (API docs)")
     print(f"   - GET  http://{host}:{port}/app (Frontend)")
     print("=" * 50)
@@ -47,7 +78,7 @@ def main():
             log_level=log_level,
             access_log=True,
             # Additional uvicorn configuration for production
-            workers=1 if reload else 4,  # Multiple workers in production
+            workers=workers,  # Multiple workers in production
             # SSL configuration (uncomment for HTTPS)
             # ssl_keyfile="path/to/keyfile.key",
             # ssl_certfile="path/to/certfile.crt",
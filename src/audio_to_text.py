@@ -1,57 +1,295 @@
 import os
-import librosa
-import whisper
-import soundfile as sf
+import shutil
+import subprocess
+import tempfile
+import threading
+import time
+import numpy as np
 from tqdm import tqdm
 import json
+from src.model_registry import lease_whisper_model
+from src.parallel_transcribe import transcribe_chunks_parallel, DEFAULT_WORKERS
+from src.metrics import stage_seconds, observe_chunk
 
-def chunk_audio(mp3_path, chunk_dir, chunk_minutes=5):
-    os.makedirs(chunk_dir, exist_ok=True)
+# Whisper works on 16 kHz mono float32, so we decode straight to that
+SAMPLE_RATE = 16000
+BYTES_PER_SAMPLE = 4  # float32
+
+# Shared decode buffers (pool mode) hold the whole decoded file: about 230 MB per hour of audio.
+# They go to the regular temp dir by default; the page cache still shares them between workers
+# without copies. /dev/shm keeps them in RAM, but is often small (64 MB in Docker by default).
+MMAP_DIR = os.getenv("AUDIO_MMAP_DIR", tempfile.gettempdir())
+
+def _feed(source, stdin, errors, block_size=1024 * 1024):
+    """Copy a readable `source` into ffmpeg's stdin, then close it."""
+    try:
+        for block in iter(lambda: source.read(block_size), b""):
+            stdin.write(block)
+    except BrokenPipeError:
+        pass  # ffmpeg stopped reading (finished or failed); its exit code tells which
+    except Exception as e:
+        errors.append(e)
+    finally:
+        try:
+            stdin.close()
+        except BrokenPipeError:
+            pass
+
+
+def decode_blocks(audio_path, block_length, sr=SAMPLE_RATE):
+    """
+    Decode audio incrementally with ffmpeg and yield float32 sample blocks
+    of `block_length` samples (the last one may be shorter).
+
+    `audio_path` may also be a binary file-like object; it is piped to
+    ffmpeg as it is read, so decoding can start on a partial upload.
+    """
+    piped = not isinstance(audio_path, (str, os.PathLike))
+    cmd = [
+        "ffmpeg", "-loglevel", "error", "-threads", "0",
+        "-i", "pipe:0" if piped else audio_path,
+        "-f", "f32le", "-ac", "1", "-ar", str(sr),
+        "-",
+    ]
+    if not piped:
+        cmd.insert(1, "-nostdin")
+    # stderr goes to a file: a full stderr pipe nobody reads until stdout ends would stall ffmpeg
+    stderr_file = tempfile.TemporaryFile()
+    process = subprocess.Popen(
+        cmd, stdin=subprocess.PIPE if piped else None,
+        stdout=subprocess.PIPE, stderr=stderr_file,
+    )
+
+    feed_errors = []
+    if piped:
+        feeder = threading.Thread(target=_feed, args=(audio_path, process.stdin, feed_errors), daemon=True)
+        feeder.start()
+
+    finished = False
+    try:
+        while True:
+            # Fresh writable buffer per block; the consumer may keep it around
+            buffer = bytearray(block_length * BYTES_PER_SAMPLE)
+            start = time.perf_counter()
+            n_bytes = process.stdout.readinto(buffer)
+            if not n_bytes:
+                finished = True
+                break
+            stage_seconds.observe(time.perf_counter() - start, stage="decode")
+            yield np.frombuffer(buffer, dtype=np.float32, count=n_bytes // BYTES_PER_SAMPLE)
+    finally:
+        if not finished:
+            # Closed before EOF: ffmpeg may still be waiting on stdin (a partial
+            # upload) or on a full stdout pipe, so waiting for it could block forever
+            process.kill()
+            if piped:
+                try:
+                    process.stdin.close()
+                except OSError:
+                    pass
+        process.stdout.close()
+        returncode = process.wait()
+        stderr_file.seek(0)
+        stderr = stderr_file.read().decode(errors="ignore")
+        stderr_file.close()
+        if piped and returncode == 0:
+            # ffmpeg saw EOF on stdin, so the feeder is done (the timeout only
+            # matters when ffmpeg stopped early and the feeder waits on the source)
+            feeder.join(timeout=1)
+
+    if feed_errors:
+        raise RuntimeError(f"Failed to read audio: {feed_errors[0]}")
+    if returncode != 0:
+        raise RuntimeError(f"Failed to decode audio: {stderr.strip()}")
+
+def probe_duration(audio_path):
+    """Duration in seconds from the container header, or None if ffprobe can't tell."""
+    cmd = [
+        "ffprobe", "-v", "error", "-show_entries", "format=duration",
+        "-of", "default=noprint_wrappers=1:nokey=1", audio_path,
+    ]
+    try:
+        output = subprocess.run(cmd, capture_output=True, text=True, timeout=30).stdout
+        return float(output.strip())
+    except (OSError, ValueError, subprocess.SubprocessError):
+        return None
+
+def stream_chunks(audio_path, chunk_minutes=5, sr=SAMPLE_RATE):
+    """
+    Decode audio incrementally and yield fixed-length windows.
+
+    Only one chunk worth of samples is held in memory at a time, so peak
+    memory is O(chunk) instead of O(file). Each chunk is a dict with the
+    chunk id, its start/end offset in seconds and the float32 samples.
+    """
+    chunk_length = int(chunk_minutes * 60 * sr)
+
+    offset = 0
+    for chunk_id, samples in enumerate(decode_blocks(audio_path, chunk_length, sr)):
+        with stage_seconds.time(stage="chunk"):
+            chunk = {
+                "chunk_id": chunk_id,
+                "start": offset / sr,
+                "end": (offset + len(samples)) / sr,
+                "audio": samples,
+            }
+        yield chunk
+        offset += len(samples)
+
+def _memmap_dir(audio_path, sr, directory):
+    """`directory`, or the regular temp dir when `directory` can't hold the decoded file."""
+    fallback = tempfile.gettempdir()
+    if directory == fallback or not isinstance(audio_path, (str, os.PathLike)):
+        return directory
+    duration = probe_duration(audio_path)
+    needed = duration * sr * BYTES_PER_SAMPLE if duration else 0
+    free = shutil.disk_usage(directory).free
+    if needed > free:
+        print(f"⚠️  {directory} has {free // 2**20} MB free, {needed // 2**20:.0f} MB needed; "
+              f"decoding to {fallback} instead")
+        return fallback
+    return directory
+
+def decode_to_memmap(audio_path, sr=SAMPLE_RATE, directory=MMAP_DIR):
+    """
+    Decode the whole file once to raw 16 kHz mono float32 in a file that
+    any process can memory-map. Returns the path; the caller removes it.
+    The file takes SAMPLE_RATE * 4 bytes per second of audio.
+    """
+    fd, pcm_path = tempfile.mkstemp(suffix=".f32", dir=_memmap_dir(audio_path, sr, directory))
+    try:
+        with os.fdopen(fd, "wb") as f:
+            for block in decode_blocks(audio_path, 60 * sr, sr):
+                block.tofile(f)
+    except Exception:
+        os.remove(pcm_path)
+        raise
+    return pcm_path
+
+def open_memmap(pcm_path):
+    # Copy-on-write: views are writable for torch.from_numpy without touching the file
+    return np.memmap(pcm_path, dtype=np.float32, mode="c")
 
-    # Load audio
-    y, sr = librosa.load(mp3_path, sr=None)
+def memmap_chunks(pcm_path, chunk_minutes=5, sr=SAMPLE_RATE):
+    """
+    Yield fixed-length chunks of a decoded buffer from `decode_to_memmap`.
 
-    # 5 minutes in samples
-    chunk_length = chunk_minutes * 60 * sr  
+    `audio` is a zero-copy view into the mapping, and `source` is
+    (path, start_sample, end_sample) so other processes can map the same
+    samples by offset instead of receiving a copy.
+    """
+    n_samples = os.path.getsize(pcm_path) // BYTES_PER_SAMPLE
+    if n_samples == 0:
+        return
 
-    # Split into chunks
+    audio = open_memmap(pcm_path)
+    chunk_length = int(chunk_minutes * 60 * sr)
+    for chunk_id, start in enumerate(range(0, n_samples, chunk_length)):
+        with stage_seconds.time(stage="chunk"):
+            end = min(start + chunk_length, n_samples)
+            chunk = {
+                "chunk_id": chunk_id,
+                "start": start / sr,
+                "end": end / sr,
+                "audio": audio[start:end],
+                "source": (pcm_path, start, end),
+            }
+        yield chunk
+
+def chunk_audio(mp3_path, chunk_dir, chunk_minutes=5):
+    import soundfile as sf
+
+    os.makedirs(chunk_dir, exist_ok=True)
+
+    # Split into chunks without loading the whole file
     chunk_files = []
-    for i in tqdm(range(0, len(y), chunk_length), desc="Chunking audio"):
-        chunk_path = os.path.join(chunk_dir, f"chunk_{i//chunk_length}.wav")
-        sf.write(chunk_path, y[i:i+chunk_length], sr, format="WAV")
+    for chunk in tqdm(stream_chunks(mp3_path, chunk_minutes), desc="Chunking audio"):
+        chunk_path = os.path.join(chunk_dir, f"chunk_{chunk['chunk_id']}.wav")
+        with stage_seconds.time(stage="chunk"):
+            sf.write(chunk_path, chunk["audio"], SAMPLE_RATE, format="WAV")
         chunk_files.append(chunk_path)
 
     return chunk_files
 
 
 
-def transcribe_chunks(chunk_files, model_name="base"):
-    model = whisper.load_model(model_name)
+def transcribe_chunk(chunk, model_name="base"):
+    """Transcribe one in-memory chunk dict from `stream_chunks`."""
+    print(f"Processing chunk: {chunk['chunk_id']} ({chunk['start']:.0f}s-{chunk['end']:.0f}s)")
+    with lease_whisper_model(model_name) as model:
+        start = time.perf_counter()
+        result = model.transcribe(chunk["audio"])
+    observe_chunk("transcribe", time.perf_counter() - start, chunk, model=model_name)
+    return {
+        "chunk_id": chunk["chunk_id"],
+        "start": chunk["start"],
+        "end": chunk["end"],
+        "transcript": result["text"].strip()
+    }
+
+def transcribe_chunks(chunks, model_name="base", workers=DEFAULT_WORKERS, on_transcript=None):
+    """
+    Transcribe audio chunks with Whisper.
+
+    `chunks` may be an iterable of chunk dicts from `stream_chunks` (decoded
+    in memory, nothing touches disk) or a list of WAV paths from `chunk_audio`.
+    With `workers` > 1 the chunks are spread over a process pool.
+    `on_transcript` is called with each transcript as soon as it is done.
+    """
+    if workers and workers > 1:
+        return transcribe_chunks_parallel(chunks, model_name=model_name, workers=workers,
+                                          on_transcript=on_transcript)
+
     transcripts = []
 
-    for i, chunk_path in enumerate(chunk_files):
-        chunk_path = os.path.abspath(chunk_path)  # make absolute path
+    for i, chunk in enumerate(chunks):
+        if isinstance(chunk, dict):
+            transcripts.append(transcribe_chunk(chunk, model_name))
+            if on_transcript:
+                on_transcript(transcripts[-1])
+            continue
+
+        chunk_path = os.path.abspath(chunk)  # make absolute path
         print(f"Processing chunk: {chunk_path}")
         
         if not os.path.exists(chunk_path):
             print(f"File not found: {chunk_path}")
             continue
         
-        result = model.transcribe(chunk_path)
+        with lease_whisper_model(model_name) as model:
+            start = time.perf_counter()
+            result = model.transcribe(chunk_path)
+        observe_chunk("transcribe", time.perf_counter() - start)
         transcripts.append({
             "chunk_id": i,
             "transcript": result["text"].strip()
         })
+        if on_transcript:
+            on_transcript(transcripts[-1])
 
     return transcripts
 
-def save_dataset(transcripts, output_file):
+def build_dataset(transcripts, keep_offsets=False):
+    """
+    Turn transcripts into the dataset entries the summarizers consume.
+
+    With `keep_offsets` the chunk start/end (seconds) are kept so time
+    labels follow the real position of chunks that were cut at pauses.
+    """
     data = []
     for t in transcripts:
-        data.append({
+        entry = {
             "transcript_chunk": t["transcript"],
             "summary": ""   # leave empty for now
-        })
+        }
+        if keep_offsets and "start" in t:
+            entry["start"] = t["start"]
+            entry["end"] = t["end"]
+        data.append(entry)
+    return data
+
+def save_dataset(transcripts, output_file):
+    data = build_dataset(transcripts)
 
     with open(output_file, "w", encoding="utf-8") as f:
         json.dump(data, f, indent=2, ensure_ascii=False)
@@ -61,14 +299,11 @@ def save_dataset(transcripts, output_file):
 
 if __name__ == "__main__":
     mp3_path = "./dataset/test.mp3"
-    chunk_dir = "./dataset/chunks"
     output_file = "./dataset/output/dataset.json"
 
-    # Step 1: split
-    chunk_files = chunk_audio(mp3_path, chunk_dir, chunk_minutes=5)
-
-    # Step 2: transcribe
-    transcripts = transcribe_chunks(chunk_files, model_name="base")
+    # Step 1 + 2: stream chunks straight into Whisper
+    chunks = stream_chunks(mp3_path, chunk_minutes=5)
+    transcripts = transcribe_chunks(chunks, model_name="base")
 
     # Step 3: save
     save_dataset(transcripts, output_file)
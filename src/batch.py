@@ -0,0 +1,218 @@
+"""
+Batch processing of many recordings on one set of preloaded models.
+
+Every file is cut into chunks that go through a single global queue, so the
+transcription pool stays busy across file boundaries instead of draining at
+the end of each file. Transcripts are regrouped per file, and a file is
+summarized and rendered as soon as its last chunk is back while the pool
+keeps transcribing the next ones.
+
+    python -m src.batch recordings/ --output-format bullet --workers 4
+"""
+
+import argparse
+import os
+import threading
+from src.audio_to_text import transcribe_chunk, build_dataset
+from src.parallel_transcribe import DEFAULT_WORKERS, iter_transcribe_parallel
+from src.pipeline import (
+    OUTPUT_FORMATS, check_output_format, summarize_data, render_result,
+    stream_audio_chunks, cached_result, save_result, write_text,
+)
+from src.resources import apply as allocate_cpus
+from src.result_cache import result_cache
+from src.stages import run_stages
+from src.vad import VAD_ENABLED
+
+AUDIO_EXTENSIONS = (".mp3", ".wav", ".m4a", ".flac", ".ogg", ".opus", ".webm", ".mp4")
+BATCH_OUTPUT_DIR = os.path.join("dataset", "batch")
+
+
+def find_audio_files(paths):
+    """Expand directories into the audio files they contain, in name order."""
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            for name in sorted(os.listdir(path)):
+                if name.lower().endswith(AUDIO_EXTENSIONS):
+                    files.append(os.path.join(path, name))
+        else:
+            files.append(path)
+    return files
+
+
+def _file_output_dir(output_dir, index, audio_path):
+    if not output_dir:
+        return None
+    name = os.path.splitext(os.path.basename(audio_path))[0]
+    path = os.path.join(output_dir, f"{index:03d}_{name}")
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def iter_process_batch(audio_paths, output_format="plain", chunk_minutes=5, model_name="base",
+                       workers=None, output_dir=None, cache=None, vad=VAD_ENABLED, overview=False):
+    """
+    Process many files and yield, in completion order:
+
+    - ("file", {"index", "audio_path", "filename", "text", "entries"}) per finished file
+    - ("error", {"index", "audio_path", "error"}) per file that could not be processed
+
+    Options are the same as `process_audio`. With `output_dir` each file's
+    outputs go to their own numbered subdirectory.
+    """
+    check_output_format(output_format)
+    workers = workers or DEFAULT_WORKERS
+    lock = threading.Lock()
+
+    # Files with a cached summary are done before anything is decoded
+    files = []
+    for index, audio_path in enumerate(audio_paths):
+        try:
+            key, summary_format, result = cached_result(
+                audio_path, output_format, chunk_minutes, model_name, cache, vad, overview
+            )
+        except OSError as e:
+            yield "error", {"index": index, "audio_path": audio_path, "error": str(e)}
+            continue
+
+        if result is not None:
+            file_dir = _file_output_dir(output_dir, index, audio_path)
+            if file_dir:
+                write_text(file_dir, result["filename"], result["text"])
+            yield "file", dict(result, index=index, audio_path=audio_path)
+            continue
+
+        files.append({
+            "index": index,
+            "audio_path": audio_path,
+            "key": key,
+            "summary_format": summary_format,
+            "transcripts": [],
+            "expected": None,  # chunk count, known once the file is fully decoded
+            "error": None,
+            "done": False,
+        })
+
+    def chunk_stream():
+        """All chunks of all files, one after another, tagged with their file."""
+        for position, state in enumerate(files):
+            count = 0
+            try:
+                for chunk in stream_audio_chunks(state["audio_path"], chunk_minutes, vad):
+                    count += 1
+                    transcript = cache.get_chunk(state["key"], chunk["chunk_id"]) if cache is not None else None
+                    if transcript is not None:
+                        with lock:
+                            state["transcripts"].append(transcript)
+                        continue
+                    chunk["file"] = position
+                    yield chunk
+            except Exception as e:
+                # A file that fails to decode is reported; the rest of the batch carries on
+                state["error"] = f"Failed to decode: {e}"
+            with lock:
+                state["expected"] = count
+
+    def finish_file(state, emit):
+        """Summarize and render a file once all of its transcripts are in."""
+        with lock:
+            if state["done"] or state["expected"] is None or len(state["transcripts"]) < state["expected"]:
+                return
+            state["done"] = True
+
+        info = {"index": state["index"], "audio_path": state["audio_path"]}
+        if state["error"]:
+            emit("error", dict(info, error=state["error"]))
+            return
+
+        try:
+            transcripts = sorted(state["transcripts"], key=lambda t: t["chunk_id"])
+            data = build_dataset(transcripts, keep_offsets=vad)
+            entries = summarize_data(data, output_format, chunk_minutes)
+            result = render_result(entries, output_format, overview)
+            file_dir = _file_output_dir(output_dir, state["index"], state["audio_path"])
+            save_result(result, output_format, data, file_dir, cache, state["key"], state["summary_format"], transcripts)
+        except Exception as e:
+            emit("error", dict(info, error=f"Processing failed: {e}"))
+            return
+        emit("file", dict(result, **info))
+
+    def assemble_stage(items, emit):
+        for chunk, transcript in items:
+            state = files[chunk["file"]]
+            if cache is not None:
+                cache.put_chunk(state["key"], transcript)
+            with lock:
+                state["transcripts"].append(transcript)
+        # A file's chunk count is only known once the next file starts decoding,
+        # so check every file rather than just the ones that got a transcript
+        for state in files:
+            finish_file(state, emit)
+        return []
+
+    if workers > 1:
+        # The pool pulls from the global chunk stream and keeps two chunks per worker in flight
+        source = iter_transcribe_parallel(chunk_stream(), model_name=model_name, workers=workers)
+        stages = [(assemble_stage, workers * 2)]
+    else:
+        def transcribe_stage(chunks, emit):
+            return [(chunk, transcribe_chunk(chunk, model_name)) for chunk in chunks]
+
+        source = chunk_stream()
+        stages = [(transcribe_stage, 1), (assemble_stage, 1)]
+
+    if files:
+        yield from run_stages(source, stages)
+
+    # Files whose last transcript arrived before their chunk count was known
+    leftover = []
+    for state in files:
+        finish_file(state, lambda event, data: leftover.append((event, data)))
+    yield from leftover
+
+
+def process_batch(audio_paths, output_format="plain", chunk_minutes=5, model_name="base",
+                  workers=None, output_dir=None, cache=None, vad=VAD_ENABLED, overview=False):
+    """Run `iter_process_batch` to completion and return one result per file, in input order."""
+    results = []
+    for event, data in iter_process_batch(audio_paths, output_format, chunk_minutes, model_name,
+                                          workers, output_dir, cache, vad, overview):
+        results.append(data)
+    return sorted(results, key=lambda r: r["index"])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Transcribe and summarize many recordings in one run.")
+    parser.add_argument("paths", nargs="+", help="Audio files or directories of audio files")
+    parser.add_argument("--output-format", choices=OUTPUT_FORMATS, default="plain")
+    parser.add_argument("--chunk-minutes", type=int, default=5)
+    parser.add_argument("--model", default="base")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS)
+    parser.add_argument("--output-dir", default=BATCH_OUTPUT_DIR)
+    parser.add_argument("--vad", action="store_true", default=VAD_ENABLED)
+    parser.add_argument("--overview", action="store_true")
+    parser.add_argument("--no-cache", action="store_true")
+    args = parser.parse_args(argv)
+
+    audio_paths = find_audio_files(args.paths)
+    allocate_cpus(pool_workers=args.workers, workers=1)
+    print(f"Processing {len(audio_paths)} files with {args.workers} worker(s)")
+
+    failed = 0
+    for event, data in iter_process_batch(
+        audio_paths, args.output_format, args.chunk_minutes, args.model, args.workers,
+        output_dir=args.output_dir, cache=None if args.no_cache else result_cache,
+        vad=args.vad, overview=args.overview,
+    ):
+        if event == "error":
+            failed += 1
+            print(f"✗ {data['audio_path']}: {data['error']}")
+        else:
+            print(f"✓ {data['audio_path']}")
+
+    print(f"Done: {len(audio_paths) - failed} succeeded, {failed} failed. Outputs in {args.output_dir}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,39 +1,52 @@
 import json
-from transformers import pipeline
-
-# Load summarizer (BART or any summarization model)
-summarizer = pipeline("summarization", model="facebook/bart-large-cnn")
-
-def text_to_bullets(input_file, output_file, chunk_minutes=5):
-    # Load dataset.json
-    with open(input_file, "r", encoding="utf-8") as f:
-        data = json.load(f)
+import time
+from src.summarizer import summarize_long, BATCH_SIZE
+from src.time_labels import chunk_label
+from src.metrics import observe_chunk
+
+BULLET_PROMPT = "Convert the following text into concise bullet points:\n"
+
+def bulletize_entries(data, chunk_minutes=5, batch_size=BATCH_SIZE, first_index=0):
+    """
+    Convert in-memory dataset entries to bullet points and return them.
+
+    `first_index` is the position of `data[0]` in the recording, used for
+    the time prefix when bulletizing a slice of the chunks.
+    """
+    # Convert to bullet points via summarization prompt, in batches
+    # Long chunks are split by token count instead of truncated
+    start = time.perf_counter()
+    all_bullets = summarize_long(
+        [entry["transcript_chunk"] for entry in data], batch_size=batch_size,
+        prompt=BULLET_PROMPT,
+        max_length=150, min_length=40, do_sample=False
+    )
+    # Batched, so each chunk is charged its share of the batch time
+    per_chunk = (time.perf_counter() - start) / max(1, len(data))
+    for _ in data:
+        observe_chunk("bullets", per_chunk)
 
     bulletized = []
-    for idx, entry in enumerate(data):
-        start_min = idx * chunk_minutes
-        end_min = (idx + 1) * chunk_minutes
-
-        # Truncate input to 4000 characters
-        chunk = entry["transcript_chunk"][:4000]
-
-        # Convert to bullet points via summarization prompt
-        bullet_prompt = f"Convert the following text into concise bullet points:\n{chunk}"
-        bullets = summarizer(
-            bullet_prompt,
-            max_length=150, min_length=40, do_sample=False
-        )[0]["summary_text"]
-
+    for idx, (entry, bullets) in enumerate(zip(data, all_bullets), start=first_index):
         # Prefix with time
-        if idx == 0:
-            prefixed = f"In the first {chunk_minutes} minutes:\n{bullets}"
-        else:
-            prefixed = f"In the {start_min}-{end_min} minutes:\n{bullets}"
+        prefixed = f"{chunk_label(idx, entry, chunk_minutes)}:\n{bullets}"
 
-        bulletized.append({
+        item = {
             "transcript_chunk": entry["transcript_chunk"],
             "bullets": prefixed
-        })
+        }
+        if "start" in entry:
+            item["start"], item["end"] = entry["start"], entry["end"]
+        bulletized.append(item)
+
+    return bulletized
+
+def text_to_bullets(input_file, output_file, chunk_minutes=5, batch_size=BATCH_SIZE):
+    # Load dataset.json
+    with open(input_file, "r", encoding="utf-8") as f:
+        data = json.load(f)
+
+    bulletized = bulletize_entries(data, chunk_minutes=chunk_minutes, batch_size=batch_size)
 
     # Save new file
     with open(output_file, "w", encoding="utf-8") as f:
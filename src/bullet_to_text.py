@@ -8,11 +8,15 @@ import json
 import sys
 from pathlib import Path
 
-def json_bullets_to_text(json_file, title="Bullet Summary"):
+def json_bullets_to_text(json_file, title="Bullet Summary", overview=None):
     """Convert JSON bullet summary to text format."""
     # Create a header
     header = f"{title.upper()}\n{'=' * len(title)}\n\n"
 
+    # Document-level summary goes right under the header
+    if overview:
+        header += f"Overview: {overview}\n\n"
+
     text_content = []
 
     for i, item in enumerate(json_file):
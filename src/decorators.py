@@ -7,11 +7,15 @@ import json
 import sys
 from pathlib import Path
 
-def json_to_text(json_file, title = "Summary"):
+def json_to_text(json_file, title = "Summary", overview=None):
     """Convert JSON summary to text format."""
     # Creating a Header for the summary
     header = f"{title.upper()}\n{'=' * len(title)}\n\n"
 
+    # Document-level summary goes right under the header
+    if overview:
+        header += f"Overview: {overview}\n\n"
+
     # Process the transcript chunks
     text_content = []
 
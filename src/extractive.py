@@ -0,0 +1,138 @@
+"""
+Extractive summaries with NumPy: no transformer model, milliseconds per chunk.
+
+Sentences are represented as TF-IDF vectors and ranked with TextRank
+(PageRank over their cosine similarities). The best ranked sentences,
+kept in their original order, make up the summary. It is a quick preview
+rather than a rewrite; the output has the same shape as the BART
+summaries so the same renderers apply.
+"""
+
+import re
+import time
+import numpy as np
+from src.time_labels import chunk_label
+from src.metrics import observe_chunk
+
+MAX_SENTENCES = 3
+MAX_BULLETS = 5
+DAMPING = 0.85
+ITERATIONS = 30
+# Whisper sometimes returns long stretches without punctuation; cut those into pseudo-sentences
+MAX_SENTENCE_WORDS = 40
+# TextRank is quadratic in sentences, so the overview only ranks each chunk's best ones
+MAX_OVERVIEW_CANDIDATES = 300
+
+SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+WORD = re.compile(r"[a-z0-9']+")
+STOPWORDS = frozenset("""
+a about after again all also am an and any are as at be because been before being between both but by
+can could did do does doing don't down during each few for from further had has have having he her here
+hers him his how i i'm if in into is it it's its just like me more most my no nor not now of off on once
+only or other our out over own really right so some such than that that's the their them then there these
+they this those through to too um uh under until up us very was we were what when where which while who
+why will with would yeah you your
+""".split())
+
+
+def split_sentences(text):
+    sentences = []
+    for sentence in SENTENCE_END.split(text.strip()):
+        words = sentence.split()
+        for start in range(0, len(words), MAX_SENTENCE_WORDS):
+            piece = " ".join(words[start:start + MAX_SENTENCE_WORDS])
+            if piece:
+                sentences.append(piece)
+    return sentences
+
+
+def tfidf_matrix(sentences):
+    """Row-normalized TF-IDF vectors, one row per sentence."""
+    tokens = [[w for w in WORD.findall(s.lower()) if w not in STOPWORDS] for s in sentences]
+    vocabulary = {}
+    rows, columns = [], []
+    for row, words in enumerate(tokens):
+        for word in words:
+            rows.append(row)
+            columns.append(vocabulary.setdefault(word, len(vocabulary)))
+
+    counts = np.zeros((len(sentences), max(1, len(vocabulary))), dtype=np.float32)
+    np.add.at(counts, (rows, columns), 1.0)
+
+    document_frequency = (counts > 0).sum(axis=0)
+    idf = np.log((1 + len(sentences)) / (1 + document_frequency)) + 1
+    weights = counts * idf
+    norms = np.linalg.norm(weights, axis=1, keepdims=True)
+    return weights / np.maximum(norms, 1e-9)
+
+
+def textrank(vectors, damping=DAMPING, iterations=ITERATIONS):
+    """PageRank scores over the cosine-similarity graph of the sentence vectors."""
+    n = len(vectors)
+    similarity = vectors @ vectors.T
+    np.fill_diagonal(similarity, 0.0)
+    out_weight = similarity.sum(axis=1, keepdims=True)
+    # Sentences with no shared words link to everything equally
+    transition = np.where(out_weight > 0, similarity / np.maximum(out_weight, 1e-9), 1.0 / n)
+
+    scores = np.full(n, 1.0 / n, dtype=np.float32)
+    for _ in range(iterations):
+        scores = (1 - damping) / n + damping * (transition.T @ scores)
+    return scores
+
+
+def rank_sentences(sentences, count):
+    """The `count` most central of `sentences`, in their original order."""
+    if len(sentences) <= count:
+        return sentences
+
+    scores = textrank(tfidf_matrix(sentences))
+    best = np.sort(np.argsort(-scores, kind="stable")[:count])
+    return [sentences[i] for i in best]
+
+
+def extract_sentences(text, count=MAX_SENTENCES):
+    """The `count` most central sentences of `text`, in their original order."""
+    return rank_sentences(split_sentences(text), count)
+
+
+def _as_bullets(sentences):
+    # json_bullets_to_text starts a new bullet after every ". "
+    return " ".join(s if s.endswith((".", "!", "?")) else f"{s}." for s in sentences)
+
+
+def extractive_entries(data, chunk_minutes=5, first_index=0, bullets=False):
+    """
+    Extractive counterpart of `summarize_entries` (or, with `bullets`,
+    `bulletize_entries`): same entries, same time prefixes.
+    """
+    summarized = []
+    for idx, entry in enumerate(data, start=first_index):
+        start = time.perf_counter()
+        sentences = extract_sentences(entry["transcript_chunk"], MAX_BULLETS if bullets else MAX_SENTENCES)
+        observe_chunk("extractive", time.perf_counter() - start)
+
+        label = chunk_label(idx, entry, chunk_minutes)
+        item = {"transcript_chunk": entry["transcript_chunk"]}
+        if bullets:
+            item["bullets"] = f"{label}:\n{_as_bullets(sentences)}"
+        else:
+            item["summary"] = f"{label}, {' '.join(sentences)}"
+        if "start" in entry:
+            item["start"], item["end"] = entry["start"], entry["end"]
+        summarized.append(item)
+
+    return summarized
+
+
+def extractive_overview(entries, count=MAX_BULLETS):
+    """
+    Document-level extractive summary. Each chunk puts forward its most
+    central sentences, up to MAX_OVERVIEW_CANDIDATES in all, and the
+    `count` best of those are kept in order.
+    """
+    per_chunk = max(1, min(MAX_BULLETS, MAX_OVERVIEW_CANDIDATES // max(1, len(entries))))
+    candidates = []
+    for entry in entries:
+        candidates.extend(extract_sentences(entry["transcript_chunk"], per_chunk))
+    return " ".join(rank_sentences(candidates, count))
@@ -0,0 +1,120 @@
+"""
+Incremental transcription of a live recording.
+
+PCM frames from the client go into a bounded ring buffer. Every time a full
+window has arrived it is transcribed and summarized while the recording
+continues, so when the client stops only the last partial window and the
+final rendering are left to do.
+"""
+
+import os
+import time
+from math import gcd
+import numpy as np
+from src.audio_to_text import SAMPLE_RATE, build_dataset
+from src.model_registry import lease_whisper_model
+from src.metrics import observe_chunk
+from src.pipeline import check_output_format, summarize_data, render_result, summary_field
+from src.vad import frame_energy_db, speech_mask, keep_speech
+from util.ring_buffer import RingBuffer
+
+LIVE_WINDOW_SECONDS = int(os.getenv("LIVE_WINDOW_SECONDS", 30))
+# How much unprocessed audio we hold before the oldest is dropped
+LIVE_BUFFER_WINDOWS = int(os.getenv("LIVE_BUFFER_WINDOWS", 4))
+
+
+def to_float32(payload, encoding="f32le"):
+    """Decode a binary PCM frame (mono) into float32 samples."""
+    if encoding == "s16le":
+        return np.frombuffer(payload, dtype="<i2").astype(np.float32) / 32768.0
+    return np.frombuffer(payload, dtype="<f4").astype(np.float32)
+
+
+def resample(samples, sample_rate, target_rate=SAMPLE_RATE):
+    if sample_rate == target_rate:
+        return samples
+    from scipy.signal import resample_poly
+
+    factor = gcd(sample_rate, target_rate)
+    return resample_poly(samples, target_rate // factor, sample_rate // factor).astype(np.float32)
+
+
+class LiveSession:
+    def __init__(self, sample_rate, output_format="plain", model_name="base",
+                 window_seconds=LIVE_WINDOW_SECONDS, buffer_windows=LIVE_BUFFER_WINDOWS):
+        check_output_format(output_format)
+        self.sample_rate = sample_rate
+        self.output_format = output_format
+        self.model_name = model_name
+        self.field = summary_field(output_format)
+
+        self.window_seconds = window_seconds
+        self.window = int(window_seconds * sample_rate)
+        self.buffer = RingBuffer(self.window * buffer_windows)
+
+        self.transcripts, self.data, self.entries = [], [], []
+
+    def feed(self, samples):
+        self.buffer.write(samples)
+
+    def ready(self):
+        return self.buffer.available >= self.window
+
+    @property
+    def dropped_seconds(self):
+        return self.buffer.dropped / self.sample_rate
+
+    def process_window(self, final=False):
+        """
+        Transcribe and summarize the next window (or, with `final`, whatever
+        is left). Returns the events produced; silent windows produce none.
+        """
+        position, samples = self.buffer.read(self.buffer.available if final else self.window)
+        start = position / self.sample_rate
+        if len(samples) == 0:
+            return []
+
+        audio = resample(samples, self.sample_rate)
+        speech = keep_speech(audio, speech_mask(frame_energy_db(audio)))
+        if len(speech) == 0:
+            return []
+
+        with lease_whisper_model(self.model_name) as model:
+            started = time.perf_counter()
+            result = model.transcribe(speech)
+        transcript = {
+            "chunk_id": len(self.transcripts),
+            "start": start,
+            "end": start + len(samples) / self.sample_rate,
+            "transcript": result["text"].strip(),
+        }
+        observe_chunk("transcribe", time.perf_counter() - started, transcript, model=self.model_name)
+
+        chunk_data = build_dataset([transcript], keep_offsets=True)
+        entry = summarize_data(chunk_data, self.output_format, self.window_seconds / 60,
+                               first_index=len(self.entries))[0]
+
+        self.transcripts.append(transcript)
+        self.data.extend(chunk_data)
+        self.entries.append(entry)
+
+        return [
+            ("transcript", transcript),
+            (self.field, dict(entry, chunk_id=transcript["chunk_id"])),
+        ]
+
+    def process_ready(self):
+        """Process every full window currently buffered."""
+        events = []
+        while self.ready():
+            events.extend(self.process_window())
+        return events
+
+    def finish(self, overview=False):
+        """Flush the remaining audio and render the final document."""
+        events = self.process_ready()
+        events.extend(self.process_window(final=True))
+
+        result = render_result(self.entries, self.output_format, overview)
+        events.append(("document", {"filename": result["filename"], "text": result["text"]}))
+        return events
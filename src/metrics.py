@@ -0,0 +1,226 @@
+"""
+Prometheus-style instrumentation, kept dependency-free.
+
+Counters, gauges and histograms live in this process and are rendered in
+the Prometheus text exposition format by `render()`. Each uvicorn worker
+process keeps its own values.
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+
+# Stage latencies range from milliseconds (rendering) to minutes (a long chunk on CPU)
+LATENCY_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600)
+# Weight of the newest sample in the moving averages used for scheduling
+EWMA_ALPHA = 0.2
+
+_metrics = []
+_averages = {}
+_averages_lock = threading.Lock()
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names, values, extra=()):
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+def _format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = None
+
+    def __init__(self, name, documentation, labels=()):
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+        _metrics.append(self)
+
+    def _key(self, labels):
+        if set(labels) != set(self.labels):
+            raise ValueError(f"{self.name} expects labels {self.labels}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labels)
+
+    def _samples(self):
+        raise NotImplementedError
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            lines.extend(self._samples())
+        return lines
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, amount=1, **labels):
+        if amount < 0:
+            raise ValueError("Counters can only go up")
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def _samples(self):
+        return [f"{self.name}{_format_labels(self.labels, key)} {_format_value(value)}"
+                for key, value in self._values.items()]
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def set(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+
+    @contextmanager
+    def track(self, **labels):
+        """Count the block as in progress while it runs."""
+        self.inc(**labels)
+        try:
+            yield
+        finally:
+            self.dec(**labels)
+
+    def _samples(self):
+        return [f"{self.name}{_format_labels(self.labels, key)} {_format_value(value)}"
+                for key, value in self._values.items()]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labels=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, documentation, labels)
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            counts, total = self._values.get(key, ([0] * len(self.buckets), 0.0))
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+            self._values[key] = (counts, total + value)
+
+    @contextmanager
+    def time(self, **labels):
+        """Observe how long the block takes, in seconds."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def _samples(self):
+        lines = []
+        for key, (counts, total) in self._values.items():
+            for bound, count in zip(self.buckets, counts):
+                labels = _format_labels(self.labels, key, [("le", _format_value(bound))])
+                lines.append(f"{self.name}_bucket{labels} {count}")
+            labels = _format_labels(self.labels, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {counts[-1]}")
+        return lines
+
+
+def render():
+    """All metrics in the Prometheus text exposition format."""
+    lines = []
+    for metric in _metrics:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+# -- pipeline metrics ---------------------------------------------------
+
+stage_seconds = Histogram(
+    "whisperize_stage_seconds",
+    "Time spent per unit of work in each pipeline stage (decode block, chunk, render).",
+    labels=("stage",),
+)
+audio_seconds = Counter(
+    "whisperize_audio_seconds_total",
+    "Seconds of audio transcribed by Whisper.",
+)
+chunks_processed = Counter(
+    "whisperize_chunks_total",
+    "Chunks that went through a pipeline stage.",
+    labels=("stage",),
+)
+model_load_seconds = Histogram(
+    "whisperize_model_load_seconds",
+    "Time taken to load a model into memory.",
+    labels=("model",),
+)
+requests_in_flight = Gauge(
+    "whisperize_requests_in_flight",
+    "Processing requests currently being handled, by endpoint.",
+    labels=("endpoint",),
+)
+jobs_gauge = Gauge(
+    "whisperize_jobs",
+    "Background jobs by status.",
+    labels=("status",),
+)
+models_loaded = Gauge(
+    "whisperize_models_loaded",
+    "Models currently held in memory, by kind.",
+    labels=("kind",),
+)
+
+
+model_rtf = Gauge(
+    "whisperize_model_rtf",
+    "Moving average of the real-time factor (processing / audio seconds) per Whisper model.",
+    labels=("model",),
+)
+
+
+def update_average(name, value, alpha=EWMA_ALPHA):
+    """Fold `value` into the exponentially weighted moving average `name`."""
+    with _averages_lock:
+        previous = _averages.get(name)
+        _averages[name] = value if previous is None else alpha * value + (1 - alpha) * previous
+        return _averages[name]
+
+
+def average(name, default=None):
+    with _averages_lock:
+        return _averages.get(name, default)
+
+
+def observe_chunk(stage, seconds, chunk=None, model=None):
+    """
+    Record one chunk's latency for `stage`. Transcriptions also count audio
+    time and, given the `model` name, update that model's real-time factor.
+    """
+    stage_seconds.observe(seconds, stage=stage)
+    chunks_processed.inc(stage=stage)
+    update_average(f"seconds:{stage}", seconds)
+    if stage == "transcribe" and chunk and "end" in chunk:
+        duration = max(0.0, chunk["end"] - chunk["start"])
+        audio_seconds.inc(duration)
+        if model and duration > 0:
+            model_rtf.set(update_average(f"rtf:{model}", seconds / duration), model=model)
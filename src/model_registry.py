@@ -0,0 +1,180 @@
+"""
+Process-wide registry of loaded Whisper models.
+
+Each worker loads a model once and shares it across requests. Models are
+kept in least-recently-used order and evicted once the total size of the
+loaded weights goes over the configured memory budget. torch and whisper
+are imported on the first load, not when the server starts.
+
+Inference goes through `lease`, which lets one thread at a time use a
+model: Whisper's decoder installs kv-cache hooks on the shared model for
+every decode, so two concurrent transcribe calls would read each other's
+cached keys and values.
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+
+from src.metrics import model_load_seconds
+from src.quantize import whisper_quantized, load_quantized
+
+# Memory budget for loaded Whisper weights (MB), configurable per deployment
+DEFAULT_BUDGET_MB = int(os.getenv("WHISPER_MEMORY_BUDGET_MB", 4096))
+
+
+def default_device():
+    import torch
+    return "cuda" if torch.cuda.is_available() else "cpu"
+
+
+def load_whisper(model_name, device=None):
+    import whisper
+    return whisper.load_model(model_name, device=device)
+
+
+def model_size_bytes(model):
+    """Size of a model's parameters and buffers in bytes."""
+    tensors = list(model.parameters()) + list(model.buffers())
+    # Quantized linear layers keep their int8 weights packed, outside parameters()
+    for module in model.modules():
+        packed = getattr(module, "_packed_params", None)
+        if packed is not None and hasattr(packed, "_weight_bias"):
+            tensors.extend(t for t in packed._weight_bias() if t is not None)
+    return sum(t.numel() * t.element_size() for t in tensors)
+
+
+def _label(key):
+    name, device, quantized = key
+    return f"{name}@{device}-int8" if quantized else f"{name}@{device}"
+
+
+class ModelRegistry:
+    def __init__(self, budget_mb=DEFAULT_BUDGET_MB, loader=load_whisper):
+        self.budget_bytes = budget_mb * 1024 * 1024
+        self._loader = loader
+        self._models = OrderedDict()  # (model_name, device, quantized) -> (model, size_bytes)
+        self._loading = {}  # key -> Event set once the thread loading it is done
+        self._in_use = {}  # key -> Lock held while a thread runs inference on that model
+        self._lock = threading.Lock()
+
+        # Stats
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.load_seconds = {}
+
+    def get(self, model_name, device=None, quantize=None):
+        """
+        Return a loaded model, loading it on first use. `quantize` forces
+        int8 on or off; by default WHISPER_QUANTIZE decides (CPU only).
+        """
+        key = self._key(model_name, device, quantize)
+        device, quantized = key[1], key[2]
+
+        while True:
+            with self._lock:
+                if key in self._models:
+                    self._models.move_to_end(key)
+                    self.hits += 1
+                    return self._models[key][0]
+                loading = self._loading.get(key)
+                if loading is None:
+                    loading = self._loading[key] = threading.Event()
+                    self.misses += 1
+                    break
+            # Another thread is loading this model; look again once it is done (or failed)
+            loading.wait()
+
+        # Load outside the lock so other models stay available meanwhile
+        try:
+            start = time.perf_counter()
+            if quantized:
+                model = load_quantized(f"whisper-{model_name}", lambda: self._loader(model_name, device=device))
+            else:
+                model = self._loader(model_name, device=device)
+            elapsed = time.perf_counter() - start
+            size = model_size_bytes(model)
+
+            with self._lock:
+                self.load_seconds[_label(key)] = round(elapsed, 3)
+                self._models[key] = (model, size)
+                self._evict(keep=key)
+            model_load_seconds.observe(elapsed, model=f"whisper-{_label(key)}")
+            return model
+        finally:
+            with self._lock:
+                del self._loading[key]
+            loading.set()
+
+    def _key(self, model_name, device=None, quantize=None):
+        device = device or default_device()
+        if quantize is None:
+            quantized = whisper_quantized(model_name, device)
+        else:
+            quantized = bool(quantize) and device == "cpu"
+        return (model_name, device, quantized)
+
+    @contextmanager
+    def lease(self, model_name, device=None, quantize=None):
+        """Like `get`, but the model is this thread's alone until the `with` block ends."""
+        key = self._key(model_name, device, quantize)
+        model = self.get(model_name, device, quantize)
+        with self._lock:
+            in_use = self._in_use.setdefault(key, threading.Lock())
+        with in_use:
+            yield model
+
+    def _evict(self, keep):
+        """Drop least-recently-used models until we are back under budget."""
+        evicted = False
+        while self._used_bytes() > self.budget_bytes and len(self._models) > 1:
+            key = next(iter(self._models))
+            if key == keep:
+                break
+            del self._models[key]
+            self.evictions += 1
+            evicted = True
+            print(f"Evicted Whisper model {_label(key)} from registry")
+
+        if evicted:
+            import torch
+            if torch.cuda.is_available():
+                torch.cuda.empty_cache()
+
+    def _used_bytes(self):
+        return sum(size for _, size in self._models.values())
+
+    def loaded(self):
+        """Names of currently loaded models, least recently used first."""
+        with self._lock:
+            return [_label(key) for key in self._models]
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "loaded": [_label(key) for key in self._models],
+                "used_mb": round(self._used_bytes() / (1024 * 1024), 1),
+                "budget_mb": round(self.budget_bytes / (1024 * 1024), 1),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+                "evictions": self.evictions,
+                "load_seconds": dict(self.load_seconds),
+            }
+
+
+# Shared registry for this worker process
+registry = ModelRegistry()
+
+
+def get_whisper_model(model_name="base", device=None, quantize=None):
+    return registry.get(model_name, device, quantize)
+
+
+def lease_whisper_model(model_name="base", device=None, quantize=None):
+    """`with lease_whisper_model(name) as model:` around every transcribe call in this process."""
+    return registry.lease(model_name, device, quantize)
@@ -0,0 +1,196 @@
+"""
+Parallel transcription engine.
+
+Chunks are fanned out to a pool of worker processes, each holding its own
+preloaded Whisper model, and the transcripts are put back in chunk order.
+There is one pool per (model, workers, threads) configuration. Pools are
+kept alive between requests so models are only loaded once; a pool is
+only shut down when no request is using it.
+"""
+
+import multiprocessing
+import os
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from src.resources import claim_slot, pin, pool_cores
+
+# Opt-in: 1 keeps transcription in the calling process
+DEFAULT_WORKERS = int(os.getenv("TRANSCRIBE_WORKERS", 1))
+DEFAULT_THREADS = int(os.getenv("TRANSCRIBE_THREADS", 0))  # 0 = split this worker's cores evenly
+# Pools nobody is using that are kept warm for the next request, least recently used are shut down first
+IDLE_POOLS = int(os.getenv("TRANSCRIBE_IDLE_POOLS", 1))
+
+_pools = OrderedDict()  # (model_name, workers, threads) -> {"pool": ProcessPoolExecutor, "users": int}
+_pool_lock = threading.Lock()
+
+# Set inside each worker process by _init_worker
+_worker_model = None
+_worker_mmaps = {}
+
+
+def threads_per_worker(workers, threads=DEFAULT_THREADS):
+    if threads and threads > 0:
+        return threads
+    return min(len(cores) for cores in pool_cores(workers))
+
+
+def _init_worker(model_name, threads, core_groups):
+    """Pin torch threads (and cores) and preload the model once per worker process."""
+    global _worker_model
+    from src.model_registry import get_whisper_model
+
+    # Each worker takes its own group of the parent's cores
+    index = claim_slot(len(core_groups), namespace=f"pool-{os.getppid()}")
+    pin(core_groups[index], threads)
+    _worker_model = get_whisper_model(model_name)
+
+
+def _chunk_audio(chunk):
+    """Samples for a chunk: sent inline, or mapped from a shared decode buffer."""
+    if "audio" in chunk:
+        return chunk["audio"]
+
+    from src.audio_to_text import open_memmap
+
+    pcm_path, start, end = chunk["source"]
+    if pcm_path not in _worker_mmaps:
+        # Only the current job's buffer is kept mapped
+        _worker_mmaps.clear()
+        _worker_mmaps[pcm_path] = open_memmap(pcm_path)
+    return _worker_mmaps[pcm_path][start:end]
+
+
+def _transcribe_one(chunk):
+    """Transcript of one chunk plus the seconds Whisper took, for the parent's metrics."""
+    start = time.perf_counter()
+    if isinstance(chunk, dict):
+        result = _worker_model.transcribe(_chunk_audio(chunk))
+        transcript = {
+            "chunk_id": chunk["chunk_id"],
+            "start": chunk["start"],
+            "end": chunk["end"],
+            "transcript": result["text"].strip()
+        }
+    else:
+        chunk_id, chunk_path = chunk
+        result = _worker_model.transcribe(chunk_path)
+        transcript = {
+            "chunk_id": chunk_id,
+            "transcript": result["text"].strip()
+        }
+    return transcript, time.perf_counter() - start
+
+
+def _start_pool(model_name, workers, threads):
+    print(f"Starting transcription pool: {workers} workers x {threads} threads ({model_name})")
+    return ProcessPoolExecutor(
+        max_workers=workers,
+        # spawn: forking a process that already holds torch state is unsafe
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_worker,
+        initargs=(model_name, threads, pool_cores(workers)),
+    )
+
+
+def _retire_idle(keep=IDLE_POOLS):
+    """Take idle pools beyond `keep` out of the table (oldest first) and return them."""
+    idle = [key for key, entry in _pools.items() if entry["users"] == 0]
+    return [_pools.pop(key)["pool"] for key in idle[:max(0, len(idle) - keep)]]
+
+
+@contextmanager
+def lease_pool(model_name, workers, threads):
+    """
+    The pool for this configuration, started on first use. It can't be
+    shut down while the `with` block runs, even if other requests use
+    other configurations meanwhile.
+    """
+    key = (model_name, workers, threads)
+    with _pool_lock:
+        if key not in _pools:
+            _pools[key] = {"pool": _start_pool(model_name, workers, threads), "users": 0}
+        _pools.move_to_end(key)
+        entry = _pools[key]
+        entry["users"] += 1
+    try:
+        yield entry["pool"]
+    finally:
+        with _pool_lock:
+            entry["users"] -= 1
+            retired = _retire_idle()
+        for pool in retired:
+            pool.shutdown(wait=True)
+
+
+def shutdown_pool():
+    """Shut down every pool that isn't in use."""
+    with _pool_lock:
+        retired = _retire_idle(keep=0)
+    for pool in retired:
+        pool.shutdown(wait=True)
+
+
+def _without_audio(chunk):
+    return {key: value for key, value in chunk.items() if key != "audio"}
+
+
+def iter_transcribe_parallel(chunks, model_name="base", workers=DEFAULT_WORKERS, threads=None):
+    """
+    Transcribe chunks on a process pool, yielding `(chunk, transcript)` in
+    completion order. `chunk` is what was submitted (chunk dicts without
+    their samples), so callers can carry extra keys through the pool.
+
+    `chunks` can be a stream of chunk dicts or a list of WAV paths. Chunks
+    from `memmap_chunks` are passed by offset and mapped zero-copy inside
+    the workers. At most two chunks per worker are in flight, so a streamed
+    input stays bounded in memory while the pool stays busy.
+    """
+    from src.metrics import observe_chunk
+
+    threads = threads or threads_per_worker(workers)
+    with lease_pool(model_name, workers, threads) as pool:
+        max_pending = workers * 2
+
+        pending = {}
+        def completed(futures):
+            for future in futures:
+                chunk = pending.pop(future)
+                transcript, seconds = future.result()
+                observe_chunk("transcribe", seconds, transcript, model=model_name)
+                yield chunk, transcript
+
+        for i, chunk in enumerate(chunks):
+            if isinstance(chunk, dict) and "source" in chunk:
+                # Memory-mapped chunk: send the offsets, not a pickled copy of the samples
+                chunk = _without_audio(chunk)
+            elif not isinstance(chunk, dict):
+                chunk_path = os.path.abspath(chunk)
+                if not os.path.exists(chunk_path):
+                    print(f"File not found: {chunk_path}")
+                    continue
+                chunk = (i, chunk_path)
+
+            future = pool.submit(_transcribe_one, chunk)
+            # Keep what identifies the chunk, but not its samples
+            pending[future] = _without_audio(chunk) if isinstance(chunk, dict) else chunk
+            if len(pending) >= max_pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                yield from completed(done)
+
+        done, _ = wait(pending)
+        yield from completed(done)
+
+
+def transcribe_chunks_parallel(chunks, model_name="base", workers=DEFAULT_WORKERS, threads=None,
+                               on_transcript=None):
+    """Transcribe chunks on a process pool and return them ordered by chunk_id."""
+    transcripts = []
+    for _, transcript in iter_transcribe_parallel(chunks, model_name, workers, threads):
+        if on_transcript:
+            on_transcript(transcript)
+        transcripts.append(transcript)
+    transcripts.sort(key=lambda t: t["chunk_id"])
+    return transcripts
@@ -0,0 +1,393 @@
+"""
+End-to-end audio processing pipeline.
+
+Every call works on its own in-memory transcripts and summaries, so
+concurrent jobs never share files. Writing intermediate results to disk
+is optional and goes to a per-job directory. With a `journal` (see
+src.transcript_store) every chunk's transcript and summary is saved as
+soon as it exists, and a rerun of the job picks up where it stopped.
+"""
+
+import json
+import os
+from src.audio_to_text import (
+    stream_chunks, transcribe_chunks, transcribe_chunk, build_dataset,
+    decode_to_memmap, memmap_chunks,
+)
+from src.parallel_transcribe import DEFAULT_WORKERS
+from src.summarize import summarize_entries
+from src.bullet_text import bulletize_entries
+from src.extractive import extractive_entries, extractive_overview
+from src.decorators import json_to_text
+from src.bullet_to_text import json_bullets_to_text
+from src.summarizer import summarize_document, cache_tag as summarizer_cache_tag, BATCH_SIZE as SUMMARIZER_BATCH_SIZE
+from src.model_registry import default_device
+from src.quantize import whisper_quantized
+from src.metrics import stage_seconds
+from src.result_cache import hash_audio, cache_key
+from src.vad import stream_speech_chunks, VAD_ENABLED
+from src.stages import run_stages
+
+# The extractive formats pick sentences with NumPy instead of running BART
+OUTPUT_FORMATS = ("plain", "bullet", "extractive", "extractive_bullet")
+BULLET_FORMATS = ("bullet", "extractive_bullet")
+EXTRACTIVE_FORMATS = ("extractive", "extractive_bullet")
+OUTPUT_FORMAT_ERROR = f"Invalid output_format. Choose one of: {', '.join(OUTPUT_FORMATS)}."
+
+# Output file names, kept the same as the old shared dataset/ layout
+DATASET_FILE = "dataset.json"
+SUMMARIZED_FILE = "dataset_summarized.json"
+SUMMARIZED_TXT = "dataset_summarized.txt"
+BULLET_FILE = "dataset_bullets.json"
+BULLET_TXT = "dataset_bullets.txt"
+
+
+def _write_json(output_dir, filename, data):
+    with open(os.path.join(output_dir, filename), "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+
+
+def write_text(output_dir, filename, text):
+    with open(os.path.join(output_dir, filename), "w", encoding="utf-8") as f:
+        f.write(text)
+
+
+def stream_audio_chunks(audio_path, chunk_minutes, vad):
+    """Chunk dicts for `audio_path`: cut at pauses with `vad`, fixed-length otherwise."""
+    if vad:
+        # Cut at pauses and drop silence before it reaches Whisper
+        return stream_speech_chunks(audio_path, chunk_minutes=chunk_minutes)
+    # Stream fixed-length chunks (decoded incrementally, never written to disk)
+    return stream_chunks(audio_path, chunk_minutes=chunk_minutes)
+
+
+def _transcribe_stream(audio_path, chunk_minutes, model_name, workers, vad, select=None, on_transcript=None):
+    """
+    Transcribe the chunks of `audio_path`, optionally filtered by `select`.
+
+    With a process pool (and no VAD) the file is decoded once into a shared
+    memory-mapped buffer and workers map their chunk by offset, instead of
+    each chunk being pickled to them. That buffer is the whole decoded file
+    (about 230 MB per hour of audio, see AUDIO_MMAP_DIR), written before
+    the first chunk is transcribed.
+    """
+    if workers > 1 and not vad:
+        pcm_path = decode_to_memmap(audio_path)
+        try:
+            chunks = memmap_chunks(pcm_path, chunk_minutes=chunk_minutes)
+            if select:
+                chunks = select(chunks)
+            return transcribe_chunks(chunks, model_name=model_name, workers=workers, on_transcript=on_transcript)
+        finally:
+            os.remove(pcm_path)
+
+    chunks = stream_audio_chunks(audio_path, chunk_minutes, vad)
+    if select:
+        chunks = select(chunks)
+    return transcribe_chunks(chunks, model_name=model_name, workers=workers, on_transcript=on_transcript)
+
+
+def _saved_transcript(chunk_id, cache, key, journal):
+    """A chunk's transcript from an earlier run of this job, or from the cache."""
+    transcript = journal.transcript(chunk_id) if journal is not None else None
+    if transcript is None and cache is not None:
+        transcript = cache.get_chunk(key, chunk_id)
+        if transcript is not None and journal is not None:
+            journal.put_transcript(transcript)
+    return transcript
+
+
+def _transcribe(audio_path, chunk_minutes, model_name, workers, cache=None, key=None, vad=False, journal=None):
+    """Transcribe `audio_path`, reusing whatever the journal and cache already have."""
+    workers = workers or DEFAULT_WORKERS
+    on_transcript = journal.put_transcript if journal is not None else None
+
+    if cache is None and journal is None:
+        return _transcribe_stream(audio_path, chunk_minutes, model_name, workers, vad)
+
+    transcripts = cache.get_transcripts(key) if cache is not None else None
+    if transcripts is not None:
+        print(f"Transcript cache hit for {key}")
+        if journal is not None:
+            for transcript in transcripts:
+                journal.put_transcript(transcript)
+        return transcripts
+
+    # Only send chunks Whisper hasn't seen before
+    saved = []
+    def skip_saved(chunks):
+        for chunk in chunks:
+            transcript = _saved_transcript(chunk["chunk_id"], cache, key, journal)
+            if transcript is not None:
+                saved.append(transcript)
+                continue
+            yield chunk
+
+    fresh = _transcribe_stream(audio_path, chunk_minutes, model_name, workers, vad, skip_saved, on_transcript)
+    transcripts = sorted(saved + fresh, key=lambda t: t["chunk_id"])
+    if cache is not None:
+        cache.put_transcripts(key, transcripts)
+    return transcripts
+
+
+def summary_field(output_format):
+    """Key holding each entry's summary: 'bullets' for bullet formats, else 'summary'."""
+    return "bullets" if output_format in BULLET_FORMATS else "summary"
+
+
+def _overview(entries, output_format):
+    """
+    Document-level summary: built recursively from the chunk summaries, or
+    for the extractive formats, picked from the whole transcript.
+    """
+    with stage_seconds.time(stage="overview"):
+        if output_format in EXTRACTIVE_FORMATS:
+            return extractive_overview(entries)
+        return summarize_document(
+            [entry[summary_field(output_format)] for entry in entries],
+            max_length=120, min_length=30, do_sample=False
+        )
+
+
+def summarize_data(data, output_format, chunk_minutes, first_index=0):
+    """Summarize (plain), bulletize (bullet) or extract from (extractive*) dataset entries."""
+    if output_format in EXTRACTIVE_FORMATS:
+        return extractive_entries(data, chunk_minutes=chunk_minutes, first_index=first_index,
+                                  bullets=output_format in BULLET_FORMATS)
+    if output_format == "plain":
+        return summarize_entries(data, chunk_minutes=chunk_minutes, first_index=first_index)
+    return bulletize_entries(data, chunk_minutes=chunk_minutes, first_index=first_index)
+
+
+def _summarize_saved(transcripts, data, output_format, chunk_minutes, journal, first_index=0):
+    """
+    `summarize_data`, reusing the entries a journal already holds. Entries
+    are saved batch by batch as they are produced.
+    """
+    if journal is None:
+        return summarize_data(data, output_format, chunk_minutes, first_index)
+
+    # Chunks are summarized in order, so saved entries form a prefix
+    entries = []
+    for transcript in transcripts:
+        entry = journal.entry(transcript["chunk_id"])
+        if entry is None:
+            break
+        entries.append(entry)
+
+    for start in range(len(entries), len(data), SUMMARIZER_BATCH_SIZE):
+        batch = summarize_data(data[start:start + SUMMARIZER_BATCH_SIZE], output_format, chunk_minutes,
+                               first_index=first_index + start)
+        for transcript, entry in zip(transcripts[start:], batch):
+            journal.put_entry(transcript["chunk_id"], entry)
+        entries.extend(batch)
+    return entries
+
+
+def render_result(entries, output_format, overview=False):
+    """Render summarized entries into the downloadable text document."""
+    document_summary = _overview(entries, output_format) if overview else None
+    if output_format not in BULLET_FORMATS:
+        with stage_seconds.time(stage="render"):
+            text_content = json_to_text(entries, title="Summary", overview=document_summary)
+        filename = SUMMARIZED_TXT
+    else:
+        with stage_seconds.time(stage="render"):
+            text_content = json_bullets_to_text(entries, title="Bullet Summary", overview=document_summary)
+        filename = BULLET_TXT
+
+    return {
+        "filename": filename,
+        "text": text_content,
+        "entries": entries,
+    }
+
+
+def _persist(output_dir, output_format, data, result):
+    """Write the job's dataset, summarized JSON and text file to `output_dir`."""
+    _write_json(output_dir, DATASET_FILE, data)
+    _write_json(output_dir, BULLET_FILE if output_format in BULLET_FORMATS else SUMMARIZED_FILE, result["entries"])
+    write_text(output_dir, result["filename"], result["text"])
+
+
+def check_output_format(output_format):
+    if output_format not in OUTPUT_FORMATS:
+        raise ValueError(OUTPUT_FORMAT_ERROR)
+
+
+def cached_result(audio_path, output_format, chunk_minutes, model_name, cache, vad, overview):
+    """Return `(key, summary_format, cached_result_or_None)`."""
+    summary_format = f"{output_format}-overview" if overview else output_format
+    if cache is None:
+        return None, summary_format, None
+
+    if output_format not in EXTRACTIVE_FORMATS:
+        # BART summaries depend on the model and its precision
+        summary_format = f"{summary_format}-{summarizer_cache_tag()}"
+    quantized = whisper_quantized(model_name, default_device())
+    key = cache_key(hash_audio(audio_path), chunk_minutes, model_name, vad, quantized)
+    result = cache.get_summary(key, summary_format)
+    if result is not None:
+        print(f"Summary cache hit for {key} ({summary_format})")
+    return key, summary_format, result
+
+
+def save_result(result, output_format, data, output_dir, cache, key, summary_format, transcripts=None):
+    """Write a finished result to `output_dir` (if any) and the cache (if any)."""
+    if output_dir:
+        _persist(output_dir, output_format, data, result)
+    if cache is not None:
+        if transcripts is not None:
+            cache.put_transcripts(key, transcripts)
+        cache.put_summary(key, summary_format, result)
+
+
+def _run_phases(audio_path, output_format, chunk_minutes, model_name, workers,
+                output_dir, cache, key, summary_format, vad, overview, journal=None):
+    """
+    Phase-by-phase execution, used with a transcription process pool:
+    all chunks are transcribed across the pool, then summarized in batches.
+    """
+    # Step 1 + 2: Stream chunks and transcribe them with Whisper as they are decoded
+    transcripts = _transcribe(audio_path, chunk_minutes, model_name, workers, cache, key, vad, journal)
+
+    # Step 3: Build the dataset in memory
+    data = build_dataset(transcripts, keep_offsets=vad)
+
+    # Step 4: Summarize or bulletize
+    entries = _summarize_saved(transcripts, data, output_format, chunk_minutes, journal)
+
+    # Step 5: Convert to text
+    result = render_result(entries, output_format, overview)
+
+    save_result(result, output_format, data, output_dir, cache, key, summary_format)
+    return result
+
+
+def _run_pipelined(audio_path, output_format, chunk_minutes, model_name,
+                   output_dir, cache, key, summary_format, vad, overview, journal=None):
+    """
+    Decoding, Whisper transcription and summarization run as concurrent
+    stages linked by bounded queues (see src.stages). Yields progress
+    events and finally `("result", result)`.
+    """
+    field = summary_field(output_format)
+    transcripts, data, entries = [], [], []
+
+    def transcribe_stage(chunks, emit):
+        outputs = []
+        for chunk in chunks:
+            transcript = _saved_transcript(chunk["chunk_id"], cache, key, journal)
+            if transcript is None:
+                transcript = transcribe_chunk(chunk, model_name)
+                if journal is not None:
+                    journal.put_transcript(transcript)
+                if cache is not None:
+                    cache.put_chunk(key, transcript)
+            emit("transcript", transcript)
+            outputs.append(transcript)
+        return outputs
+
+    def summarize_stage(new_transcripts, emit):
+        # Chunks that queued up while the previous batch ran are summarized together
+        chunk_data = build_dataset(new_transcripts, keep_offsets=vad)
+        new_entries = _summarize_saved(new_transcripts, chunk_data, output_format, chunk_minutes, journal,
+                                       first_index=len(entries))
+
+        transcripts.extend(new_transcripts)
+        data.extend(chunk_data)
+        entries.extend(new_entries)
+        for transcript, entry in zip(new_transcripts, new_entries):
+            emit(field, dict(entry, chunk_id=transcript["chunk_id"]))
+        return []
+
+    stages = [(transcribe_stage, 1), (summarize_stage, SUMMARIZER_BATCH_SIZE)]
+    yield from run_stages(stream_audio_chunks(audio_path, chunk_minutes, vad), stages)
+
+    result = render_result(entries, output_format, overview)
+    save_result(result, output_format, data, output_dir, cache, key, summary_format, transcripts)
+    yield "result", result
+
+
+def _replay(result, output_format):
+    """Events for a cached result, as if it had just been computed."""
+    field = summary_field(output_format)
+    for chunk_id, entry in enumerate(result["entries"]):
+        yield "transcript", {"chunk_id": chunk_id, "transcript": entry["transcript_chunk"]}
+        yield field, dict(entry, chunk_id=chunk_id)
+    yield "result", result
+
+
+def process_audio(audio_path, output_format="plain", chunk_minutes=5, model_name="base",
+                  workers=None, output_dir=None, cache=None, vad=VAD_ENABLED, overview=False, journal=None):
+    """
+    Transcribe and summarize one audio file.
+
+    Returns a dict with the rendered `text`, its download `filename` and the
+    summarized `entries`. When `output_dir` is given the dataset, the
+    summarized JSON and the text file are also written there. With a
+    `cache` (see src.result_cache) transcripts and summaries of previously
+    seen audio are reused. With `vad` silence is skipped and chunks are
+    cut at pauses. With `overview` a document-level summary of all chunk
+    summaries is added under the title. With a `journal` each chunk is
+    saved as it completes and chunks saved by an earlier run are skipped.
+
+    In a single process the stages run pipelined; with `workers` > 1
+    chunks are transcribed on the process pool first, then summarized.
+    """
+    check_output_format(output_format)
+
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+
+    key, summary_format, result = cached_result(
+        audio_path, output_format, chunk_minutes, model_name, cache, vad, overview
+    )
+    if result is not None:
+        if output_dir:
+            write_text(output_dir, result["filename"], result["text"])
+        return result
+
+    workers = workers or DEFAULT_WORKERS
+    if workers > 1:
+        return _run_phases(audio_path, output_format, chunk_minutes, model_name, workers,
+                           output_dir, cache, key, summary_format, vad, overview, journal)
+
+    for event, data in _run_pipelined(audio_path, output_format, chunk_minutes, model_name,
+                                      output_dir, cache, key, summary_format, vad, overview, journal):
+        if event == "result":
+            return data
+
+
+def iter_process_audio(audio_path, output_format="plain", chunk_minutes=5, model_name="base",
+                       output_dir=None, cache=None, vad=VAD_ENABLED, overview=False):
+    """
+    Run the pipeline and yield `(event, data)` pairs as results become
+    available:
+
+    - ("transcript", transcript) once a chunk is transcribed
+    - ("summary" | "bullets", entry) once that chunk is summarized
+    - ("document", {"filename", "text"}) with the final rendered document
+
+    Same options as `process_audio`; the final result is cached and
+    persisted the same way.
+    """
+    check_output_format(output_format)
+
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+
+    key, summary_format, result = cached_result(
+        audio_path, output_format, chunk_minutes, model_name, cache, vad, overview
+    )
+    if result is not None:
+        events = _replay(result, output_format)
+    else:
+        events = _run_pipelined(audio_path, output_format, chunk_minutes, model_name,
+                                output_dir, cache, key, summary_format, vad, overview)
+
+    for event, data in events:
+        if event == "result":
+            yield "document", {"filename": data["filename"], "text": data["text"]}
+        else:
+            yield event, data
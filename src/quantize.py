@@ -0,0 +1,69 @@
+"""
+Dynamic int8 quantization for CPU inference.
+
+The linear layers of Whisper and BART hold almost all of their weights and
+compute. Quantizing them to int8 at load time (activations stay float and
+are quantized on the fly) roughly halves model memory and speeds up CPU
+inference, at the cost of a small drift in the output text.
+
+Quantized models are saved under QUANTIZED_MODEL_DIR, so they are built
+once and afterwards loaded directly.
+"""
+
+import os
+
+# Comma-separated Whisper model names to quantize, or "all"
+WHISPER_QUANTIZE = {name.strip() for name in os.getenv("WHISPER_QUANTIZE", "").split(",") if name.strip()}
+SUMMARIZER_QUANTIZE = os.getenv("SUMMARIZER_QUANTIZE", "False").lower() == "true"
+QUANTIZED_MODEL_DIR = os.getenv(
+    "QUANTIZED_MODEL_DIR", os.path.join(os.path.expanduser("~"), ".cache", "whisperize", "quantized")
+)
+
+
+def whisper_quantized(model_name, device):
+    """Whether `model_name` should be loaded quantized. Dynamic quantization is CPU-only."""
+    if device != "cpu":
+        return False
+    return "all" in WHISPER_QUANTIZE or model_name in WHISPER_QUANTIZE
+
+
+def quantize_linear(model):
+    """Replace every linear layer of `model` with a dynamically quantized int8 one."""
+    import torch
+
+    for module in model.modules():
+        # Whisper uses nn.Linear subclasses, and quantize_dynamic only swaps exact types
+        if isinstance(module, torch.nn.Linear) and type(module) is not torch.nn.Linear:
+            module.__class__ = torch.nn.Linear
+    return torch.quantization.quantize_dynamic(model.eval(), {torch.nn.Linear}, dtype=torch.qint8)
+
+
+def _cache_path(name):
+    import torch
+
+    # Pickled modules are tied to the torch version that wrote them
+    safe_name = name.replace("/", "--")
+    return os.path.join(QUANTIZED_MODEL_DIR, f"{safe_name}-int8-torch{torch.__version__}.pt")
+
+
+def load_quantized(name, build):
+    """
+    Return the int8 version of the model `name`, from the on-disk cache if
+    present. `build()` loads the fp32 model when it has to be quantized.
+    """
+    import torch
+
+    path = _cache_path(name)
+    if os.path.exists(path):
+        try:
+            return torch.load(path, map_location="cpu", weights_only=False)
+        except Exception as e:
+            print(f"Ignoring unreadable quantized model {path}: {e}")
+
+    model = quantize_linear(build())
+    os.makedirs(QUANTIZED_MODEL_DIR, exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    torch.save(model, tmp_path)
+    os.replace(tmp_path, path)
+    print(f"Quantized {name} to int8 and cached it at {path}")
+    return model
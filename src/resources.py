@@ -0,0 +1,160 @@
+"""
+CPU allocation across server workers and model pools.
+
+torch runs one intra-op thread per core by default, in every process. With
+several uvicorn workers, each with its own transcription pool, that means
+many times more compute threads than cores, all fighting over the same
+caches. Here the available cores are split into one slot per uvicorn
+worker, and a worker's slot is split again between its own process
+(summarizer, in-process Whisper) and its transcription pool processes.
+Each process sets its torch thread count to the size of its share and,
+with CPU_AFFINITY=True, is pinned to those cores.
+
+Processes claim slots by taking an flock on a per-slot file, so a
+restarted worker gets the slot its predecessor released.
+"""
+
+import os
+import sys
+import tempfile
+
+try:
+    import fcntl
+except ImportError:  # Windows: fall back to picking slots by pid
+    fcntl = None
+
+RELOAD = os.getenv("RELOAD", "True").lower() == "true"
+WORKERS = int(os.getenv("WORKERS", 4))
+CPU_AFFINITY = os.getenv("CPU_AFFINITY", "False").lower() == "true"
+CPU_SLOT_DIR = os.getenv(
+    "CPU_SLOT_DIR", os.path.join(tempfile.gettempdir(), f"whisperize-cpu-{os.getenv('PORT', 8000)}")
+)
+
+# Set by apply() for this process
+_cores = None
+_slot = None
+_slot_files = []
+
+
+def web_workers():
+    """Number of uvicorn worker processes main.py starts."""
+    return 1 if RELOAD else max(1, WORKERS)
+
+
+def available_cores():
+    if hasattr(os, "sched_getaffinity"):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+
+def partition(cores, parts):
+    """Split `cores` into `parts` contiguous groups. With fewer cores than parts, groups share cores."""
+    if len(cores) < parts:
+        return [[cores[i % len(cores)]] for i in range(parts)]
+    size, extra = divmod(len(cores), parts)
+    groups, start = [], 0
+    for i in range(parts):
+        end = start + size + (1 if i < extra else 0)
+        groups.append(cores[start:end])
+        start = end
+    return groups
+
+
+def split_slot(cores, pool_workers):
+    """Cores for this process and for each pool worker. Without a pool the process keeps them all."""
+    if pool_workers <= 1:
+        return cores, []
+    groups = partition(cores, pool_workers + 1)
+    return groups[0], groups[1:]
+
+
+def claim_slot(count, namespace="web"):
+    """Index of a free slot in `namespace`, held until this process exits."""
+    if fcntl is None:
+        return os.getpid() % count
+
+    os.makedirs(CPU_SLOT_DIR, exist_ok=True)
+    for index in range(count):
+        f = open(os.path.join(CPU_SLOT_DIR, f"{namespace}-{index}.lock"), "w")
+        try:
+            fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            f.close()
+            continue
+        _slot_files.append(f)  # closing the file would release the lock
+        return index
+
+    # More processes than slots (e.g. an old worker still shutting down): share one
+    return os.getpid() % count
+
+
+def pin(cores, threads=None):
+    """Set torch's thread count for this process and, if enabled, its CPU affinity."""
+    threads = threads or len(cores)
+    # torch reads these when it is first imported; set them so a lazy import still gets its share
+    os.environ["OMP_NUM_THREADS"] = os.environ["MKL_NUM_THREADS"] = str(threads)
+    torch = sys.modules.get("torch")
+    if torch is not None:
+        torch.set_num_threads(threads)
+    if CPU_AFFINITY and hasattr(os, "sched_setaffinity"):
+        os.sched_setaffinity(0, cores)
+
+
+def process_cores():
+    """Cores this process may use: its slot once apply() ran, otherwise everything."""
+    return _cores if _cores is not None else available_cores()
+
+
+def pool_cores(pool_workers):
+    """Core groups for a transcription pool of `pool_workers` processes started from this process."""
+    return split_slot(process_cores(), pool_workers)[1] or [process_cores()]
+
+
+def apply(pool_workers=1, workers=None):
+    """Claim this process's slot, pin torch to it and return the allocation."""
+    global _cores, _slot
+
+    workers = workers or web_workers()
+    slots = partition(available_cores(), workers)
+    _slot = claim_slot(len(slots)) if workers > 1 else 0
+    _cores = slots[_slot]
+
+    own, pool = split_slot(_cores, pool_workers)
+    pin(own)
+
+    allocation = stats(pool_workers, workers)
+    pool_info = f", pool {len(pool)} x {len(pool[0])} threads" if pool else ""
+    print(f"CPU slot {_slot + 1}/{len(slots)} (pid {os.getpid()}): cores {_format(_cores)}, "
+          f"{len(own)} torch threads{pool_info}")
+    return allocation
+
+
+def _format(cores):
+    if cores and cores == list(range(cores[0], cores[-1] + 1)):
+        return f"{cores[0]}-{cores[-1]}" if len(cores) > 1 else str(cores[0])
+    return ",".join(str(core) for core in cores)
+
+
+def plan(pool_workers=1, workers=None):
+    """Allocation for every web worker, as main.py reports it before starting them."""
+    workers = workers or web_workers()
+    layout = []
+    for cores in partition(available_cores(), workers):
+        own, pool = split_slot(cores, pool_workers)
+        layout.append({"cores": _format(cores), "threads": len(own), "pool": [len(group) for group in pool]})
+    return layout
+
+
+def stats(pool_workers=1, workers=None):
+    cores = process_cores()
+    own, pool = split_slot(cores, pool_workers)
+    return {
+        "available_cores": len(available_cores()),
+        "web_workers": workers or web_workers(),
+        "slot": _slot,
+        "cores": _format(cores),
+        "torch_threads": len(own),
+        "pool_workers": pool_workers,
+        "pool_threads": [len(group) for group in pool],
+        "affinity": CPU_AFFINITY,
+    }
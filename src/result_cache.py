@@ -0,0 +1,195 @@
+"""
+Content-addressed cache of pipeline results.
+
+Entries are keyed by a hash of the audio bytes plus the parameters that
+change the output (`chunk_minutes`, `model_name`, int8 or not). Two levels
+are kept:
+
+- per-chunk transcripts, so switching `output_format` skips Whisper
+- per-format summaries, so an identical resubmission returns immediately
+
+The cache is bounded in size and evicts least-recently-used entries.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import threading
+
+CACHE_DIR = os.getenv("RESULT_CACHE_DIR", os.path.join("dataset", "cache"))
+CACHE_MAX_MB = int(os.getenv("RESULT_CACHE_MB", 1024))
+CACHE_ENABLED = os.getenv("RESULT_CACHE", "True").lower() == "true"
+
+
+def hash_audio(audio_path, block_size=1024 * 1024):
+    """SHA-256 of the audio file, read in blocks."""
+    digest = hashlib.sha256()
+    with open(audio_path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def cache_key(audio_hash, chunk_minutes, model_name, vad=False, quantized=False):
+    # int8 Whisper transcribes slightly differently, so its transcripts are kept apart
+    key = f"{audio_hash}-{model_name}{'-int8' if quantized else ''}-{chunk_minutes}m"
+    # Pause-aligned chunks differ from fixed-length ones, so cache them apart
+    return f"{key}-vad" if vad else key
+
+
+def _dir_size(path):
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.path.getsize(os.path.join(root, name))
+            except OSError:
+                pass
+    return total
+
+
+class ResultCache:
+    def __init__(self, root=CACHE_DIR, max_mb=CACHE_MAX_MB):
+        self.root = root
+        self.max_bytes = max_mb * 1024 * 1024
+        self.transcripts_dir = os.path.join(root, "transcripts")
+        self.summaries_dir = os.path.join(root, "summaries")
+        os.makedirs(self.transcripts_dir, exist_ok=True)
+        os.makedirs(self.summaries_dir, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self.counters = {
+            "chunk": {"hits": 0, "misses": 0},
+            "transcripts": {"hits": 0, "misses": 0},
+            "summary": {"hits": 0, "misses": 0},
+        }
+        self.evictions = 0
+
+    # -- helpers --------------------------------------------------------
+
+    def _count(self, level, hit):
+        with self._lock:
+            self.counters[level]["hits" if hit else "misses"] += 1
+
+    def _read_json(self, path):
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return None
+        # Touch so eviction sees this entry as recently used
+        os.utime(path, None)
+        return data
+
+    def _write_json(self, path, data):
+        # Write to a temp file and rename so readers never see partial JSON
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+    def _chunk_path(self, key, chunk_id):
+        return os.path.join(self.transcripts_dir, key, f"chunk_{chunk_id}.json")
+
+    def _summary_path(self, key, output_format):
+        return os.path.join(self.summaries_dir, f"{key}-{output_format}.json")
+
+    # -- transcripts ----------------------------------------------------
+
+    def get_chunk(self, key, chunk_id):
+        transcript = self._read_json(self._chunk_path(key, chunk_id))
+        self._count("chunk", transcript is not None)
+        return transcript
+
+    def put_chunk(self, key, transcript):
+        os.makedirs(os.path.join(self.transcripts_dir, key), exist_ok=True)
+        self._write_json(self._chunk_path(key, transcript["chunk_id"]), transcript)
+
+    def get_transcripts(self, key):
+        """All transcripts for `key`, or None unless every chunk is cached."""
+        index = self._read_json(os.path.join(self.transcripts_dir, key, "index.json"))
+        transcripts = None
+        if index is not None:
+            transcripts = [self._read_json(self._chunk_path(key, i)) for i in index["chunk_ids"]]
+            if any(t is None for t in transcripts):
+                transcripts = None
+
+        self._count("transcripts", transcripts is not None)
+        return transcripts
+
+    def put_transcripts(self, key, transcripts):
+        """Cache a complete transcript set and mark it as complete."""
+        for transcript in transcripts:
+            self.put_chunk(key, transcript)
+        index = {"chunk_ids": [t["chunk_id"] for t in transcripts]}
+        self._write_json(os.path.join(self.transcripts_dir, key, "index.json"), index)
+        self.evict()
+
+    # -- summaries ------------------------------------------------------
+
+    def get_summary(self, key, output_format):
+        result = self._read_json(self._summary_path(key, output_format))
+        self._count("summary", result is not None)
+        return result
+
+    def put_summary(self, key, output_format, result):
+        self._write_json(self._summary_path(key, output_format), result)
+        self.evict()
+
+    # -- eviction and stats ---------------------------------------------
+
+    def _entries(self):
+        """(path, size, last_used) for every cache entry."""
+        entries = []
+        for name in os.listdir(self.transcripts_dir):
+            path = os.path.join(self.transcripts_dir, name)
+            mtimes = [os.path.getmtime(os.path.join(path, f)) for f in os.listdir(path)] or [os.path.getmtime(path)]
+            entries.append((path, _dir_size(path), max(mtimes)))
+        for name in os.listdir(self.summaries_dir):
+            path = os.path.join(self.summaries_dir, name)
+            entries.append((path, os.path.getsize(path), os.path.getmtime(path)))
+        return entries
+
+    def size_bytes(self):
+        return sum(size for _, size, _ in self._entries())
+
+    def evict(self):
+        """Remove least-recently-used entries until the cache fits its budget."""
+        with self._lock:
+            try:
+                entries = sorted(self._entries(), key=lambda e: e[2])
+            except OSError:
+                # Another worker removed something mid-scan; try again next time
+                return
+
+            total = sum(size for _, size, _ in entries)
+            for path, size, _ in entries:
+                if total <= self.max_bytes:
+                    break
+                if os.path.isdir(path):
+                    shutil.rmtree(path, ignore_errors=True)
+                elif os.path.exists(path):
+                    os.remove(path)
+                total -= size
+                self.evictions += 1
+
+    def stats(self):
+        with self._lock:
+            counters = {level: dict(c) for level, c in self.counters.items()}
+            evictions = self.evictions
+        for c in counters.values():
+            lookups = c["hits"] + c["misses"]
+            c["hit_rate"] = round(c["hits"] / lookups, 3) if lookups else 0.0
+
+        return {
+            "enabled": CACHE_ENABLED,
+            "size_mb": round(self.size_bytes() / (1024 * 1024), 2),
+            "max_mb": round(self.max_bytes / (1024 * 1024), 2),
+            "evictions": evictions,
+            "levels": counters,
+        }
+
+
+# Shared cache for this worker process (None when disabled)
+result_cache = ResultCache() if CACHE_ENABLED else None
@@ -0,0 +1,178 @@
+"""
+Full-text search over everything transcribed so far.
+
+Every finished recording adds its chunk transcripts to an SQLite FTS5
+index (porter-stemmed, so "summarize" also finds "summarizing"). A hit
+points to the recording, the chunk and its minute range, with the same
+"In the 5-10 minutes" label the summaries use. Lookups go through the
+inverted index and rank by BM25, so they stay in the milliseconds over
+thousands of hours of audio.
+"""
+
+import json
+import os
+import sqlite3
+import time
+from src.sqlite_db import Connections
+from src.time_labels import chunk_time_range, time_label
+
+SEARCH_INDEX_PATH = os.getenv("SEARCH_INDEX", os.path.join("dataset", "store", "search.db"))
+SEARCH_ENABLED = os.getenv("SEARCH_INDEX_ENABLED", "True").lower() == "true"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS recordings (
+    recording_id TEXT PRIMARY KEY,
+    name TEXT,
+    chunk_minutes INTEGER,
+    chunks INTEGER NOT NULL,
+    meta TEXT,
+    indexed_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS segments (
+    segment_id INTEGER PRIMARY KEY,
+    recording_id TEXT NOT NULL,
+    chunk_id INTEGER NOT NULL,
+    start_min INTEGER NOT NULL,
+    end_min INTEGER NOT NULL,
+    UNIQUE (recording_id, chunk_id)
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS segments_fts USING fts5(text, tokenize = 'porter unicode61');
+"""
+
+
+def to_match_query(query):
+    """Plain words to an FTS5 query matching all of them; quoting keeps user input from being parsed as syntax."""
+    terms = [term.replace('"', '""') for term in query.split()]
+    return " ".join(f'"{term}"' for term in terms)
+
+
+class SearchIndex:
+    def __init__(self, path=SEARCH_INDEX_PATH):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._connections = Connections(path)
+        self._connect().executescript(SCHEMA)
+
+    def _connect(self):
+        return self._connections.get()
+
+    def add_recording(self, recording_id, name, entries, chunk_minutes=5, **meta):
+        """
+        Index a recording's summarized entries (one per chunk, in order).
+        Indexing the same `recording_id` again replaces it.
+        """
+        db = self._connect()
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            self._remove(db, recording_id)
+            for chunk_id, entry in enumerate(entries):
+                start_min, end_min = chunk_time_range(chunk_id, entry, chunk_minutes)
+                cursor = db.execute(
+                    "INSERT INTO segments (recording_id, chunk_id, start_min, end_min) VALUES (?, ?, ?, ?)",
+                    (recording_id, chunk_id, start_min, end_min),
+                )
+                db.execute("INSERT INTO segments_fts (rowid, text) VALUES (?, ?)",
+                           (cursor.lastrowid, entry["transcript_chunk"]))
+            db.execute(
+                "INSERT INTO recordings (recording_id, name, chunk_minutes, chunks, meta, indexed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (recording_id, name, chunk_minutes, len(entries), json.dumps(meta), time.time()),
+            )
+            db.execute("COMMIT")
+        except Exception:
+            db.execute("ROLLBACK")
+            raise
+
+    def _remove(self, db, recording_id):
+        db.execute(
+            "DELETE FROM segments_fts WHERE rowid IN (SELECT segment_id FROM segments WHERE recording_id = ?)",
+            (recording_id,),
+        )
+        db.execute("DELETE FROM segments WHERE recording_id = ?", (recording_id,))
+        db.execute("DELETE FROM recordings WHERE recording_id = ?", (recording_id,))
+
+    def remove(self, recording_id):
+        db = self._connect()
+        db.execute("BEGIN IMMEDIATE")
+        self._remove(db, recording_id)
+        db.execute("COMMIT")
+
+    def search(self, query, limit=20, hits_per_recording=5):
+        """
+        Recordings whose transcripts contain every word of `query`, best
+        match first, each with up to `hits_per_recording` matching chunks.
+        """
+        match = to_match_query(query)
+        if not match:
+            return []
+
+        # Enough rows that `limit` recordings still get several hits each
+        rows = self._connect().execute(
+            """
+            SELECT s.recording_id, s.chunk_id, s.start_min, s.end_min,
+                   snippet(segments_fts, 0, '[', ']', '…', 16) AS snippet,
+                   bm25(segments_fts) AS score
+            FROM segments_fts JOIN segments s ON s.segment_id = segments_fts.rowid
+            WHERE segments_fts MATCH ?
+            ORDER BY score
+            LIMIT ?
+            """,
+            (match, limit * hits_per_recording),
+        ).fetchall()
+
+        recordings = {}
+        for row in rows:
+            hits = recordings.setdefault(row["recording_id"], [])
+            if len(hits) < hits_per_recording:
+                hits.append({
+                    "chunk_id": row["chunk_id"],
+                    "start_minute": row["start_min"],
+                    "end_minute": row["end_min"],
+                    "label": time_label(row["start_min"], row["end_min"]),
+                    "snippet": row["snippet"],
+                    # bm25 is lower-is-better; flip it so higher means more relevant
+                    "score": round(-row["score"], 3),
+                })
+
+        ids = list(recordings)[:limit]
+        if not ids:
+            return []
+        info = {
+            row["recording_id"]: row for row in self._connect().execute(
+                f"SELECT * FROM recordings WHERE recording_id IN ({', '.join('?' * len(ids))})", ids
+            )
+        }
+        results = []
+        for recording_id in ids:
+            row = info.get(recording_id)
+            results.append({
+                "recording_id": recording_id,
+                "name": row["name"] if row else None,
+                "indexed_at": row["indexed_at"] if row else None,
+                "meta": json.loads(row["meta"]) if row and row["meta"] else {},
+                "hits": sorted(recordings[recording_id], key=lambda hit: hit["chunk_id"]),
+            })
+        return results
+
+    def stats(self):
+        db = self._connect()
+        return {
+            "path": self.path,
+            "recordings": db.execute("SELECT COUNT(*) FROM recordings").fetchone()[0],
+            "chunks": db.execute("SELECT COUNT(*) FROM segments").fetchone()[0],
+            "size_mb": round(os.path.getsize(self.path) / (1024 * 1024), 2),
+        }
+
+
+# Shared index for this worker process (None when disabled)
+search_index = SearchIndex() if SEARCH_ENABLED else None
+
+
+def index_result(recording_id, name, result, chunk_minutes=5, **meta):
+    """Add a finished pipeline result to the search index. Never fails the caller."""
+    if search_index is None or not result or not result.get("entries"):
+        return
+    try:
+        search_index.add_recording(recording_id, name, result["entries"], chunk_minutes, **meta)
+    except sqlite3.Error as e:
+        print(f"⚠️  Could not index {recording_id} for search: {e}")
@@ -0,0 +1,28 @@
+"""
+SQLite connections for the on-disk stores (transcript store, search index).
+
+Both databases are in WAL mode and written by job workers and request
+threads at the same time, so each thread gets its own connection. Every
+connection is in autocommit mode: a write is its own small transaction
+unless the caller issues BEGIN itself.
+"""
+
+import sqlite3
+import threading
+
+
+class Connections:
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+
+    def get(self):
+        """This thread's connection to `path`, opened on first use."""
+        db = getattr(self._local, "db", None)
+        if db is None:
+            db = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            db.row_factory = sqlite3.Row
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            self._local.db = db
+        return db
@@ -0,0 +1,136 @@
+"""
+Run pipeline stages concurrently, linked by bounded queues.
+
+The source (e.g. the audio decoder) and every stage run in their own
+thread, so decoding chunk N+2, transcribing chunk N+1 and summarizing
+chunk N overlap. End-to-end time then approaches the slowest stage instead
+of the sum of all stages. The bounded queues give backpressure: a fast
+stage blocks once the next one is `queue_size` items behind.
+"""
+
+import os
+import queue
+import threading
+
+QUEUE_SIZE = int(os.getenv("PIPELINE_QUEUE_SIZE", 2))
+
+_DONE = object()
+_POLL_SECONDS = 0.1
+
+
+class _Failed:
+    def __init__(self, error):
+        self.error = error
+
+
+def _put(q, item, stop):
+    """Blocking put that gives up once `stop` is set."""
+    while not stop.is_set():
+        try:
+            q.put(item, timeout=_POLL_SECONDS)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+
+def _get(q, stop):
+    while not stop.is_set():
+        try:
+            return q.get(timeout=_POLL_SECONDS)
+        except queue.Empty:
+            continue
+    return _DONE
+
+
+def run_stages(source, stages, queue_size=QUEUE_SIZE):
+    """
+    Feed `source` through `stages` and yield the `(event, data)` pairs they emit.
+
+    Each stage is a `(fn, max_batch)` pair. `fn(items, emit)` gets between
+    one and `max_batch` items (whatever is already waiting, so a slow stage
+    batches naturally), may call `emit(event, data)` to report progress, and
+    returns the items to pass to the next stage. An exception in any thread
+    stops the pipeline and is re-raised here.
+    """
+    stop = threading.Event()
+    events = queue.Queue()
+    inboxes = [queue.Queue(maxsize=queue_size) for _ in stages]
+
+    def emit(event, data):
+        events.put((event, data))
+
+    def produce():
+        try:
+            for item in source:
+                if not _put(inboxes[0], item, stop):
+                    break
+            _put(inboxes[0], _DONE, stop)
+        except Exception as e:
+            events.put(_Failed(e))
+        finally:
+            if hasattr(source, "close"):
+                source.close()
+
+    def work(index, fn, max_batch):
+        inbox = inboxes[index]
+        outbox = inboxes[index + 1] if index + 1 < len(stages) else None
+        try:
+            while True:
+                item = _get(inbox, stop)
+                if item is _DONE:
+                    break
+
+                # Take whatever else is already queued, up to max_batch
+                items = [item]
+                finished = False
+                while len(items) < max_batch:
+                    try:
+                        extra = inbox.get_nowait()
+                    except queue.Empty:
+                        break
+                    if extra is _DONE:
+                        finished = True
+                        break
+                    items.append(extra)
+
+                for output in fn(items, emit):
+                    if outbox is not None and not _put(outbox, output, stop):
+                        return
+                if finished:
+                    break
+
+            if outbox is not None:
+                _put(outbox, _DONE, stop)
+            else:
+                events.put(_DONE)
+        except Exception as e:
+            events.put(_Failed(e))
+
+    threads = [threading.Thread(target=produce, name="stage-source", daemon=True)]
+    for index, (fn, max_batch) in enumerate(stages):
+        threads.append(threading.Thread(
+            target=work, args=(index, fn, max(1, max_batch)), name=f"stage-{index}", daemon=True
+        ))
+    for thread in threads:
+        thread.start()
+
+    finished = False
+    try:
+        while True:
+            event = events.get()
+            if event is _DONE:
+                finished = True
+                break
+            if isinstance(event, _Failed):
+                raise event.error
+            yield event
+    finally:
+        stop.set()
+        if finished:
+            for thread in threads:
+                thread.join()
+        # Stopped early (the consumer closed us or a stage failed): the threads end on
+        # their own once their current item is done. Waiting for that here could block
+        # for a whole model call, and an abandoned generator may be closed on the
+        # server's event loop.
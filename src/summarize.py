@@ -1,37 +1,51 @@
 import json
-from transformers import pipeline
-
-# Load summarizer
-summarizer = pipeline("summarization", model="facebook/bart-large-cnn")
-
-def summarize_existing_dataset(input_file, output_file, chunk_minutes=5):
-    # Load dataset.json
-    with open(input_file, "r", encoding="utf-8") as f:
-        data = json.load(f)
+import time
+from src.summarizer import summarize_long, BATCH_SIZE
+from src.time_labels import chunk_label
+from src.metrics import observe_chunk
+
+def summarize_entries(data, chunk_minutes=5, batch_size=BATCH_SIZE, first_index=0):
+    """
+    Summarize in-memory dataset entries and return the summarized entries.
+
+    `first_index` is the position of `data[0]` in the recording, used for
+    the time prefix when summarizing a slice of the chunks.
+    """
+    # Summarize transcripts in batches
+    # Long chunks are split by token count and summarized map-reduce style
+    # instead of being truncated to what BART can read (1024 tokens)
+    chunks = [entry["transcript_chunk"] for entry in data]
+    start = time.perf_counter()
+    summaries = summarize_long(
+        chunks, batch_size=batch_size,
+        max_length=80, min_length=20, do_sample=False
+    )
+    # Batched, so each chunk is charged its share of the batch time
+    per_chunk = (time.perf_counter() - start) / max(1, len(data))
+    for _ in data:
+        observe_chunk("summarize", per_chunk)
 
     summarized = []
-    for idx, entry in enumerate(data):
-        start_min = idx * chunk_minutes
-        end_min = (idx + 1) * chunk_minutes
-
-        # Summarize transcript
-        # Truncate input to 4000 characters (safe for BART)
-        chunk = entry["transcript_chunk"][:4000] # Bart can handle up to 4000 characters or 1024 tokens
-        summary_text = summarizer(
-            chunk,
-            max_length=80, min_length=20, do_sample=False
-        )[0]["summary_text"]
-
+    for idx, (entry, summary_text) in enumerate(zip(data, summaries), start=first_index):
         # Prefix with time
-        if idx == 0:
-            prefixed = f"In the first {chunk_minutes} minutes, {summary_text}"
-        else:
-            prefixed = f"In the {start_min}-{end_min} minutes, {summary_text}"
+        prefixed = f"{chunk_label(idx, entry, chunk_minutes)}, {summary_text}"
 
-        summarized.append({
+        item = {
             "transcript_chunk": entry["transcript_chunk"],
             "summary": prefixed
-        })
+        }
+        if "start" in entry:
+            item["start"], item["end"] = entry["start"], entry["end"]
+        summarized.append(item)
+
+    return summarized
+
+def summarize_existing_dataset(input_file, output_file, chunk_minutes=5, batch_size=BATCH_SIZE):
+    # Load dataset.json
+    with open(input_file, "r", encoding="utf-8") as f:
+        data = json.load(f)
+
+    summarized = summarize_entries(data, chunk_minutes=chunk_minutes, batch_size=batch_size)
 
     # Save new file
     with open(output_file, "w", encoding="utf-8") as f:
@@ -41,4 +55,4 @@ def summarize_existing_dataset(input_file, output_file, chunk_minutes=5):
 
 
 if __name__ == "__main__":
-    summarize_existing_dataset("./dataset/output/dataset.json", "./dataset/summarized/normal/dataset_summarized.json", 5)
\ No newline at end of file
+    summarize_existing_dataset("./dataset/output/dataset.json", "./dataset/summarized/normal/dataset_summarized.json", 5)
@@ -0,0 +1,197 @@
+"""
+Shared, lazily loaded summarization pipeline.
+
+The plain summary and bullet paths both use the same BART model, so it is
+built once per process on first use (or via `warm_up`) instead of at import.
+torch and transformers are only imported then, too.
+"""
+
+import os
+import re
+import threading
+import time
+from src.metrics import model_load_seconds
+from src.quantize import SUMMARIZER_QUANTIZE, load_quantized
+
+SUMMARIZER_MODEL = os.getenv("SUMMARIZER_MODEL", "facebook/bart-large-cnn")
+BATCH_SIZE = int(os.getenv("SUMMARIZER_BATCH_SIZE", 4))
+# BART reads at most 1024 tokens; keep some headroom for special tokens
+MAX_INPUT_TOKENS = int(os.getenv("SUMMARIZER_MAX_INPUT_TOKENS", 1000))
+MAX_REDUCE_LEVELS = 8
+
+_summarizer = None
+_load_seconds = None
+_lock = threading.Lock()
+
+
+def build_summarizer(quantize=SUMMARIZER_QUANTIZE):
+    """A new summarization pipeline; with `quantize`, int8 on CPU."""
+    import torch
+    from transformers import pipeline, AutoModelForSeq2SeqLM, AutoTokenizer
+
+    if not quantize or torch.cuda.is_available():
+        return pipeline("summarization", model=SUMMARIZER_MODEL)
+
+    model = load_quantized(SUMMARIZER_MODEL, lambda: AutoModelForSeq2SeqLM.from_pretrained(SUMMARIZER_MODEL))
+    tokenizer = AutoTokenizer.from_pretrained(SUMMARIZER_MODEL)
+    return pipeline("summarization", model=model, tokenizer=tokenizer)
+
+
+def get_summarizer():
+    """Return the shared summarization pipeline, loading it on first call."""
+    global _summarizer, _load_seconds
+
+    if _summarizer is None:
+        with _lock:
+            # Another thread may have loaded it while we were waiting
+            if _summarizer is None:
+                start = time.perf_counter()
+                _summarizer = build_summarizer()
+                elapsed = time.perf_counter() - start
+                _load_seconds = round(elapsed, 3)
+                model_load_seconds.observe(elapsed, model=SUMMARIZER_MODEL)
+                print(f"Loaded summarizer {SUMMARIZER_MODEL} in {_load_seconds}s")
+
+    return _summarizer
+
+
+def cache_tag():
+    """The summarizer model and precision this process uses, for result cache keys."""
+    from src.model_registry import default_device
+
+    name = SUMMARIZER_MODEL.replace("/", "--")
+    return f"{name}-int8" if SUMMARIZER_QUANTIZE and default_device() == "cpu" else name
+
+
+def is_loaded():
+    return _summarizer is not None
+
+
+def warm_up():
+    """Load the summarizer ahead of the first request."""
+    get_summarizer()
+    return {"model": SUMMARIZER_MODEL, "quantized": SUMMARIZER_QUANTIZE, "load_seconds": _load_seconds}
+
+
+def summarize_batch(texts, batch_size=BATCH_SIZE, **generate_kwargs):
+    """
+    Summarize many texts with batched forward passes.
+
+    Texts are bucketed by length so each batch holds similarly sized inputs
+    and padding stays small. Summaries come back in the original order.
+    """
+    summarizer = get_summarizer()
+    batch_size = max(1, batch_size)
+
+    # Sort by length so neighbours in a batch pad to roughly the same size
+    order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+    summaries = [None] * len(texts)
+
+    for start in range(0, len(order), batch_size):
+        indices = order[start:start + batch_size]
+        outputs = summarizer(
+            [texts[i] for i in indices],
+            batch_size=len(indices),
+            **generate_kwargs
+        )
+        for i, output in zip(indices, outputs):
+            summaries[i] = output["summary_text"]
+
+    return summaries
+
+
+def _token_lengths(texts):
+    tokenizer = get_summarizer().tokenizer
+    encoded = tokenizer(texts, add_special_tokens=False)["input_ids"]
+    return [len(ids) for ids in encoded]
+
+
+def split_by_tokens(text, max_tokens=MAX_INPUT_TOKENS):
+    """
+    Split `text` into pieces of at most `max_tokens` tokens.
+
+    Pieces are packed from whole sentences; a sentence that is longer than
+    the budget on its own is cut on token boundaries.
+    """
+    if _token_lengths([text])[0] <= max_tokens:
+        return [text]
+
+    tokenizer = get_summarizer().tokenizer
+    sentences = [s for s in re.split(r"(?<=[.!?])\s+", text) if s]
+    lengths = _token_lengths(sentences)
+
+    pieces = []
+    current, current_len = [], 0
+    for sentence, length in zip(sentences, lengths):
+        if length > max_tokens:
+            # Flush what came before first, so pieces stay in reading order
+            if current:
+                pieces.append(" ".join(current))
+                current, current_len = [], 0
+            ids = tokenizer(sentence, add_special_tokens=False)["input_ids"]
+            for start in range(0, len(ids), max_tokens):
+                pieces.append(tokenizer.decode(ids[start:start + max_tokens]))
+            continue
+
+        if current and current_len + length > max_tokens:
+            pieces.append(" ".join(current))
+            current, current_len = [], 0
+        current.append(sentence)
+        current_len += length
+
+    if current:
+        pieces.append(" ".join(current))
+    return pieces
+
+
+def summarize_long(texts, batch_size=BATCH_SIZE, prompt="", max_tokens=MAX_INPUT_TOKENS, **generate_kwargs):
+    """
+    Summarize texts of any length without truncating them (map-reduce).
+
+    Each text is split into pieces that fit the model, all pieces of all
+    texts are summarized together in batches, and texts that produced more
+    than one summary are summarized again from their joined summaries until
+    one remains. A text that already fits is summarized in a single pass.
+    `prompt` is prepended to every model input.
+    """
+    budget = max_tokens - (_token_lengths([prompt])[0] if prompt else 0)
+    pending = {i: text for i, text in enumerate(texts)}
+    summaries = [None] * len(texts)
+
+    for _ in range(MAX_REDUCE_LEVELS):
+        if not pending:
+            break
+
+        # Map: split every pending text and summarize all pieces at once
+        owners, pieces = [], []
+        for i, text in pending.items():
+            for piece in split_by_tokens(text, budget):
+                owners.append(i)
+                pieces.append(piece)
+
+        outputs = summarize_batch([prompt + piece for piece in pieces], batch_size=batch_size, **generate_kwargs)
+
+        grouped = {}
+        for i, output in zip(owners, outputs):
+            grouped.setdefault(i, []).append(output)
+
+        # Reduce: texts with several partial summaries go round again
+        pending = {}
+        for i, parts in grouped.items():
+            if len(parts) == 1:
+                summaries[i] = parts[0]
+            else:
+                pending[i] = " ".join(parts)
+
+    # Out of levels (pathological input): keep what we have
+    for i, text in pending.items():
+        summaries[i] = text
+
+    return summaries
+
+
+def summarize_document(texts, batch_size=BATCH_SIZE, **generate_kwargs):
+    """One document-level summary over many chunk summaries."""
+    if not texts:
+        return ""
+    return summarize_long([" ".join(texts)], batch_size=batch_size, **generate_kwargs)[0]
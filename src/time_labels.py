@@ -0,0 +1,50 @@
+"""Minute ranges for the time prefixes the summarizers put on each chunk."""
+
+import math
+
+
+def chunk_time_range(idx, entry, chunk_minutes=5):
+    """
+    Start and end minute of a dataset entry.
+
+    Entries cut at pauses carry their real `start`/`end` offsets in seconds;
+    fixed-length chunks fall back to their position on the chunk grid.
+    """
+    if "start" in entry and "end" in entry:
+        start_min = int(entry["start"] // 60)
+        end_min = max(start_min + 1, math.ceil(entry["end"] / 60))
+        return start_min, end_min
+
+    return idx * chunk_minutes, (idx + 1) * chunk_minutes
+
+
+def time_label(start_min, end_min):
+    """'In the first 5 minutes' / 'In the 5-10 minutes'."""
+    if start_min == 0:
+        return f"In the first {end_min} minutes"
+    return f"In the {start_min}-{end_min} minutes"
+
+
+def _clock(seconds):
+    seconds = int(round(seconds))
+    return f"{seconds // 60}:{seconds % 60:02d}"
+
+
+def seconds_label(start, end):
+    """'In the first 0:30' / 'In 0:30-1:00'."""
+    if start < 0.5:
+        return f"In the first {_clock(end)}"
+    return f"In {_clock(start)}-{_clock(end)}"
+
+
+def chunk_label(idx, entry, chunk_minutes=5):
+    """
+    Time prefix for a dataset entry. Chunks that aren't whole minutes long
+    (e.g. 30 s live windows) are labelled to the second, since rounding
+    them to minutes would give neighbouring chunks the same label.
+    """
+    if float(chunk_minutes).is_integer():
+        return time_label(*chunk_time_range(idx, entry, chunk_minutes))
+    if "start" in entry and "end" in entry:
+        return seconds_label(entry["start"], entry["end"])
+    return seconds_label(idx * chunk_minutes * 60, (idx + 1) * chunk_minutes * 60)
@@ -0,0 +1,254 @@
+"""
+Durable per-job store of chunk transcripts and summaries (SQLite).
+
+Each chunk's transcript and summary entry is appended as soon as it is
+produced, keyed by job id and chunk id, so a job that crashes or fails
+halfway keeps everything done up to that point. Running the job again
+with the same journal skips straight to the first chunk that is missing.
+Rows are only ever inserted, and a sequence number lets clients read a
+job's results back incrementally while it runs.
+
+The database is in WAL mode and shared by all workers on the host; every
+write is its own small transaction.
+"""
+
+import json
+import os
+import time
+import uuid
+from src.sqlite_db import Connections
+
+try:
+    import fcntl
+except ImportError:  # Windows: no liveness check, unfinished jobs are resumed on startup
+    fcntl = None
+
+STORE_PATH = os.getenv("TRANSCRIPT_STORE", os.path.join("dataset", "store", "transcripts.db"))
+STORE_ENABLED = os.getenv("TRANSCRIPT_STORE_ENABLED", "True").lower() == "true"
+STORE_TTL_DAYS = float(os.getenv("TRANSCRIPT_STORE_TTL_DAYS", 7))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    job_id TEXT PRIMARY KEY,
+    audio_path TEXT,
+    run TEXT NOT NULL,
+    params TEXT NOT NULL,
+    status TEXT NOT NULL,
+    owner TEXT,
+    error TEXT,
+    result TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS chunks (
+    seq INTEGER PRIMARY KEY,
+    job_id TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    chunk_id INTEGER NOT NULL,
+    data TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    UNIQUE (job_id, kind, chunk_id)
+);
+CREATE INDEX IF NOT EXISTS chunks_by_job ON chunks (job_id, seq);
+CREATE INDEX IF NOT EXISTS jobs_by_status ON jobs (status, updated_at);
+"""
+
+# Jobs in these states were cut short if their owner process is gone
+UNFINISHED = ("queued", "running")
+
+# Each process holds an flock on its owner file while it lives. Pids get
+# reused across container restarts, so they can't tell us who is alive.
+OWNER = uuid.uuid4().hex
+
+
+class TranscriptStore:
+    def __init__(self, path=STORE_PATH):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.owners_dir = os.path.join(os.path.dirname(path) or ".", "owners")
+        self._connections = Connections(path)
+        self._owner_file = None
+        self._connect().executescript(SCHEMA)
+
+    def _hold_owner_lock(self):
+        if fcntl is None or self._owner_file is not None:
+            return
+        os.makedirs(self.owners_dir, exist_ok=True)
+        self._owner_file = open(os.path.join(self.owners_dir, f"{OWNER}.lock"), "w")
+        fcntl.flock(self._owner_file, fcntl.LOCK_EX)
+
+    def _alive(self, owner):
+        """Whether the process that recorded `owner` is still running."""
+        if not owner or owner == OWNER:
+            return owner == OWNER
+        if fcntl is None:
+            return False
+        path = os.path.join(self.owners_dir, f"{owner}.lock")
+        try:
+            with open(path, "a") as f:
+                fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except FileNotFoundError:
+            return False
+        except OSError:
+            return True
+        os.remove(path)
+        return False
+
+    def _connect(self):
+        return self._connections.get()
+
+    # -- jobs -----------------------------------------------------------
+
+    def create(self, job_id, audio_path, run, params):
+        """
+        Record a job before it is queued. `run` holds the pipeline arguments
+        needed to run it again, `params` what the job status reports.
+        """
+        self._hold_owner_lock()
+        now = time.time()
+        self._connect().execute(
+            "INSERT OR IGNORE INTO jobs (job_id, audio_path, run, params, status, owner, created_at, updated_at) "
+            "VALUES (?, ?, ?, ?, 'queued', ?, ?, ?)",
+            (job_id, audio_path, json.dumps(run), json.dumps(params), OWNER, now, now),
+        )
+
+    def _set(self, job_id, **fields):
+        fields["updated_at"] = time.time()
+        columns = ", ".join(f"{name} = ?" for name in fields)
+        self._connect().execute(f"UPDATE jobs SET {columns} WHERE job_id = ?", (*fields.values(), job_id))
+
+    def start(self, job_id):
+        self._hold_owner_lock()
+        self._set(job_id, status="running", owner=OWNER, error=None)
+
+    def finish(self, job_id, result):
+        self._set(job_id, status="done", result=json.dumps(result, ensure_ascii=False))
+
+    def fail(self, job_id, error):
+        self._set(job_id, status="failed", error=error)
+
+    def requeue(self, job_id):
+        """Move a failed job back to queued for this process. False if someone else got there first."""
+        self._hold_owner_lock()
+        cursor = self._connect().execute(
+            "UPDATE jobs SET status = 'queued', owner = ?, error = NULL, updated_at = ? "
+            "WHERE job_id = ? AND status = 'failed'",
+            (OWNER, time.time(), job_id),
+        )
+        return cursor.rowcount > 0
+
+    def get(self, job_id):
+        row = self._connect().execute("SELECT * FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+        job = dict(row)
+        for field in ("run", "params", "result"):
+            job[field] = json.loads(job[field]) if job[field] else None
+        return job
+
+    def claim_orphans(self):
+        """
+        Take over unfinished jobs whose owning process has died, e.g. after
+        a crash or restart. Each job is claimed by exactly one worker.
+        """
+        rows = self._connect().execute(
+            f"SELECT job_id, owner FROM jobs WHERE status IN ({', '.join('?' * len(UNFINISHED))})",
+            UNFINISHED,
+        ).fetchall()
+
+        claimed = []
+        for row in rows:
+            if self._alive(row["owner"]):
+                continue
+            # Compare-and-set on the owner so concurrent workers don't both resume it
+            cursor = self._connect().execute(
+                "UPDATE jobs SET owner = ?, status = 'queued', updated_at = ? WHERE job_id = ? AND owner IS ?",
+                (OWNER, time.time(), row["job_id"], row["owner"]),
+            )
+            if cursor.rowcount:
+                self._hold_owner_lock()
+                claimed.append(self.get(row["job_id"]))
+        return claimed
+
+    def prune(self, ttl_days=STORE_TTL_DAYS):
+        """Forget finished jobs older than `ttl_days`. Returns their audio paths."""
+        cutoff = time.time() - ttl_days * 86400
+        db = self._connect()
+        rows = db.execute(
+            "SELECT job_id, audio_path FROM jobs WHERE status IN ('done', 'failed') AND updated_at < ?", (cutoff,)
+        ).fetchall()
+        for row in rows:
+            db.execute("DELETE FROM chunks WHERE job_id = ?", (row["job_id"],))
+            db.execute("DELETE FROM jobs WHERE job_id = ?", (row["job_id"],))
+        return [row["audio_path"] for row in rows if row["audio_path"]]
+
+    # -- chunks ---------------------------------------------------------
+
+    def append(self, job_id, kind, chunk_id, data):
+        # First write wins: a resumed job never rewrites a chunk it already has
+        self._connect().execute(
+            "INSERT OR IGNORE INTO chunks (job_id, kind, chunk_id, data, created_at) VALUES (?, ?, ?, ?, ?)",
+            (job_id, kind, chunk_id, json.dumps(data, ensure_ascii=False), time.time()),
+        )
+
+    def chunks(self, job_id, after=0, limit=500):
+        """Rows appended for `job_id` with a sequence number above `after`, oldest first."""
+        rows = self._connect().execute(
+            "SELECT seq, kind, chunk_id, data FROM chunks WHERE job_id = ? AND seq > ? ORDER BY seq LIMIT ?",
+            (job_id, after, limit),
+        ).fetchall()
+        return [
+            {"seq": row["seq"], "kind": row["kind"], "chunk_id": row["chunk_id"], "data": json.loads(row["data"])}
+            for row in rows
+        ]
+
+    def journal(self, job_id):
+        return JobJournal(self, job_id)
+
+    def stats(self):
+        db = self._connect()
+        statuses = dict(db.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall())
+        return {
+            "path": self.path,
+            "jobs": statuses,
+            "chunks": db.execute("SELECT COUNT(*) FROM chunks").fetchone()[0],
+            "size_mb": round(os.path.getsize(self.path) / (1024 * 1024), 2),
+        }
+
+
+class JobJournal:
+    """One job's view of the store, handed to the pipeline."""
+
+    def __init__(self, store, job_id):
+        self.store = store
+        self.job_id = job_id
+        # What an earlier run already produced, loaded once
+        self._saved = {"transcript": {}, "entry": {}}
+        after = 0
+        while True:
+            rows = store.chunks(job_id, after)
+            if not rows:
+                break
+            for row in rows:
+                self._saved[row["kind"]][row["chunk_id"]] = row["data"]
+            after = rows[-1]["seq"]
+
+    def transcript(self, chunk_id):
+        return self._saved["transcript"].get(chunk_id)
+
+    def entry(self, chunk_id):
+        return self._saved["entry"].get(chunk_id)
+
+    def put_transcript(self, transcript):
+        self.store.append(self.job_id, "transcript", transcript["chunk_id"], transcript)
+
+    def put_entry(self, chunk_id, entry):
+        self.store.append(self.job_id, "entry", chunk_id, entry)
+
+    def resumed_from(self):
+        """Number of chunks this job already had transcribed before this run."""
+        return len(self._saved["transcript"])
+
+
+# Shared store for this worker process (None when disabled)
+transcript_store = TranscriptStore() if STORE_ENABLED else None
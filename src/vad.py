@@ -0,0 +1,136 @@
+"""
+Energy-based voice activity detection.
+
+Frames are scored by RMS energy in a single vectorized pass. Frames well
+above the recording's noise floor count as speech, and short pauses are
+bridged so words are not clipped. The detector is used to drop long
+silences before Whisper sees them and to move chunk boundaries into pauses
+instead of cutting through words.
+"""
+
+import os
+import time
+import numpy as np
+from src.audio_to_text import decode_blocks, SAMPLE_RATE
+from src.metrics import stage_seconds
+
+VAD_ENABLED = os.getenv("VAD_ENABLED", "False").lower() == "true"
+
+FRAME_SECONDS = 0.03
+MARGIN_DB = 12.0         # speech must be this far above the noise floor
+MIN_THRESHOLD_DB = -55.0  # never treat anything quieter than this as speech
+MAX_THRESHOLD_DB = -35.0  # always treat anything louder than this as speech
+HANGOVER_SECONDS = 0.5   # speech padding on both sides, also bridges short gaps
+SEARCH_SECONDS = 30.0    # how far a chunk boundary may move to find a pause
+
+
+def frame_energy_db(samples, sr=SAMPLE_RATE, frame_seconds=FRAME_SECONDS):
+    """RMS energy in dBFS of consecutive non-overlapping frames."""
+    frame_length = max(1, int(sr * frame_seconds))
+    n_frames = -(-len(samples) // frame_length)  # ceil
+
+    padded = np.zeros(n_frames * frame_length, dtype=np.float32)
+    padded[:len(samples)] = samples
+    frames = padded.reshape(n_frames, frame_length)
+
+    rms = np.sqrt(np.mean(frames * frames, axis=1))
+    return 20 * np.log10(np.maximum(rms, 1e-10))
+
+
+def speech_mask(energy_db, frame_seconds=FRAME_SECONDS, margin_db=MARGIN_DB,
+                hangover_seconds=HANGOVER_SECONDS):
+    """Boolean speech/non-speech decision per frame."""
+    if len(energy_db) == 0:
+        return np.zeros(0, dtype=bool)
+
+    noise_floor = np.percentile(energy_db, 10)
+    threshold = np.clip(noise_floor + margin_db, MIN_THRESHOLD_DB, MAX_THRESHOLD_DB)
+    active = energy_db > threshold
+
+    # Dilate speech by the hangover on both sides; this also fills pauses
+    # shorter than twice the hangover
+    pad = int(round(hangover_seconds / frame_seconds))
+    if pad > 0:
+        kernel = np.ones(2 * pad + 1)
+        active = np.convolve(active.astype(np.float32), kernel, mode="same") > 0
+
+    return active
+
+
+def find_pause(mask, energy_db, target, radius):
+    """
+    Frame index to cut at: the silent frame nearest to `target` within
+    `radius` frames, or the quietest frame in that window if there is none.
+    """
+    lo = max(0, target - radius)
+    hi = min(len(mask), target + radius + 1)
+    if lo >= hi:
+        return target
+
+    silent = np.flatnonzero(~mask[lo:hi]) + lo
+    if len(silent):
+        return int(silent[np.argmin(np.abs(silent - target))])
+    return int(lo + np.argmin(energy_db[lo:hi]))
+
+
+def keep_speech(samples, mask, sr=SAMPLE_RATE, frame_seconds=FRAME_SECONDS):
+    """Samples of `samples` that fall in speech frames, concatenated."""
+    frame_length = max(1, int(sr * frame_seconds))
+    sample_mask = np.repeat(mask, frame_length)[:len(samples)]
+    return samples[sample_mask]
+
+
+def stream_speech_chunks(audio_path, chunk_minutes=5, sr=SAMPLE_RATE, search_seconds=SEARCH_SECONDS):
+    """
+    Like `stream_chunks`, but boundaries are moved to the nearest pause and
+    silence is dropped from each chunk. Chunks with no speech are skipped.
+
+    `start`/`end` are still offsets in the original audio, so time labels
+    stay correct. Memory is bounded by roughly two chunks.
+    """
+    frame_length = max(1, int(sr * FRAME_SECONDS))
+    chunk_length = int(chunk_minutes * 60 * sr)
+    search = int(search_seconds * sr)
+
+    buffer = np.zeros(0, dtype=np.float32)
+    offset = 0  # position of buffer[0] in the original audio
+    chunk_id = 0
+
+    def emit(samples, start):
+        nonlocal chunk_id
+        energy = frame_energy_db(samples, sr)
+        speech = keep_speech(samples, speech_mask(energy), sr)
+        if len(speech) == 0:
+            return None
+
+        chunk = {
+            "chunk_id": chunk_id,
+            "start": start / sr,
+            "end": (start + len(samples)) / sr,
+            "audio": speech,
+        }
+        chunk_id += 1
+        return chunk
+
+    for block in decode_blocks(audio_path, chunk_length, sr):
+        buffer = np.concatenate([buffer, block])
+
+        # Cut whenever we can see far enough past the nominal boundary
+        while len(buffer) >= chunk_length + search:
+            start = time.perf_counter()
+            energy = frame_energy_db(buffer, sr)
+            mask = speech_mask(energy)
+            cut_frame = find_pause(mask, energy, chunk_length // frame_length, search // frame_length)
+            cut = max(frame_length, cut_frame * frame_length)
+
+            chunk = emit(buffer[:cut], offset)
+            stage_seconds.observe(time.perf_counter() - start, stage="chunk")
+            if chunk:
+                yield chunk
+            buffer = buffer[cut:].copy()
+            offset += cut
+
+    if len(buffer):
+        chunk = emit(buffer, offset)
+        if chunk:
+            yield chunk
@@ -0,0 +1,76 @@
+import io
+import shutil
+import threading
+import time
+import wave
+
+import numpy as np
+import pytest
+
+from src.audio_to_text import decode_blocks, memmap_chunks
+from src.metrics import stage_seconds
+
+
+def chunk_observations():
+    counts, _ = stage_seconds._values.get(("chunk",), ([0], 0.0))
+    return counts[-1]
+
+
+class StalledUpload:
+    """Hands out `data`, then blocks like an upload whose client went quiet."""
+
+    def __init__(self, data):
+        self._data = io.BytesIO(data)
+        self.resume = threading.Event()
+
+    def read(self, size=-1):
+        block = self._data.read(size)
+        if not block:
+            self.resume.wait()
+        return block
+
+
+def wav_bytes(seconds, sr=16000):
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(sr)
+        f.writeframes(np.zeros(int(seconds * sr), dtype=np.int16).tobytes())
+    return buffer.getvalue()
+
+
+def test_memmap_chunks_are_views_with_their_offsets(tmp_path):
+    pcm_path = tmp_path / "audio.f32"
+    np.arange(250, dtype=np.float32).tofile(pcm_path)
+
+    chunks = list(memmap_chunks(str(pcm_path), chunk_minutes=1, sr=100 / 60))
+
+    assert [chunk["source"][1:] for chunk in chunks] == [(0, 100), (100, 200), (200, 250)]
+    assert chunks[-1]["audio"].tolist() == list(range(200, 250))
+
+
+def test_memmap_chunks_observe_the_chunk_stage(tmp_path):
+    pcm_path = tmp_path / "audio.f32"
+    np.zeros(250, dtype=np.float32).tofile(pcm_path)
+    before = chunk_observations()
+
+    list(memmap_chunks(str(pcm_path), chunk_minutes=1, sr=100 / 60))
+
+    assert chunk_observations() == before + 3
+
+
+@pytest.mark.skipif(shutil.which("ffmpeg") is None, reason="needs ffmpeg")
+def test_closing_a_piped_decode_early_does_not_wait_for_the_upload():
+    upload = StalledUpload(wav_bytes(20))
+    blocks = decode_blocks(upload, 19 * 16000)
+    assert len(next(blocks)) == 19 * 16000
+    # Let ffmpeg write out the rest and go back to waiting on stdin
+    time.sleep(0.5)
+
+    closer = threading.Thread(target=blocks.close)
+    closer.start()
+    closer.join(timeout=5)
+    upload.resume.set()
+
+    assert not closer.is_alive()
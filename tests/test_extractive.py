@@ -0,0 +1,35 @@
+from src import extractive
+from src.extractive import extract_sentences, extractive_overview
+
+
+def chunk(index, sentences=40):
+    # Filler shares no words with anything; the budget sentences recur in every chunk
+    filler = " ".join(f"Filler{index}x{n} unrelated{index}x{n}." for n in range(sentences))
+    theme = f"The budget review covers hiring in part {index}. Hiring budget review ends part {index}."
+    return {"transcript_chunk": f"{filler} {theme}"}
+
+
+def test_extract_sentences_keeps_the_original_order():
+    text = "Cats purr. Dogs bark loudly at cats. Cats and dogs share a home. Birds sing."
+    assert extract_sentences(text, 2) == ["Dogs bark loudly at cats.", "Cats and dogs share a home."]
+
+
+def test_overview_ranks_a_bounded_set_of_sentences(monkeypatch):
+    entries = [chunk(i) for i in range(200)]
+    sizes = []
+    tfidf_matrix = extractive.tfidf_matrix
+
+    def recording_tfidf(sentences):
+        sizes.append(len(sentences))
+        return tfidf_matrix(sentences)
+
+    monkeypatch.setattr(extractive, "tfidf_matrix", recording_tfidf)
+    overview = extractive_overview(entries, count=3)
+
+    assert max(sizes) <= extractive.MAX_OVERVIEW_CANDIDATES
+    # The theme shared across chunks wins over each chunk's filler, in document order
+    picked = overview.split(". ")
+    assert len(picked) == 3
+    assert all("budget" in sentence for sentence in picked)
+    numbers = [int(sentence.rstrip(".").split()[-1]) for sentence in picked]
+    assert numbers == sorted(numbers)
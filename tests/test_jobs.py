@@ -0,0 +1,29 @@
+import pytest
+
+from backend.services.jobs import JobManager, QueueFull
+
+
+def test_reserve_is_bounded_by_the_queue_size():
+    manager = JobManager(queue_size=2)
+    first = manager.reserve()
+    manager.reserve()
+
+    with pytest.raises(QueueFull):
+        manager.reserve()
+
+    first.release()
+    first.release()
+    assert manager.stats()["inline"] == 1
+    manager.reserve()
+
+
+def test_backlog_counts_inline_runs_until_released():
+    manager = JobManager(workers=2)
+    slot = manager.reserve()
+    assert manager.backlog_seconds() == 0
+
+    slot.start(60)
+    assert manager.backlog_seconds() == pytest.approx(30, abs=0.1)
+
+    slot.release()
+    assert manager.backlog_seconds() == 0
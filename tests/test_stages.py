@@ -0,0 +1,50 @@
+import threading
+import time
+
+import pytest
+
+from src.stages import run_stages
+
+
+def test_runs_every_item_through_every_stage():
+    def double(items, emit):
+        return [item * 2 for item in items]
+
+    def report(items, emit):
+        for item in items:
+            emit("value", item)
+        return []
+
+    events = list(run_stages(range(5), [(double, 1), (report, 3)]))
+    assert events == [("value", value) for value in (0, 2, 4, 6, 8)]
+
+
+def test_stage_error_is_raised_to_the_consumer():
+    def broken(items, emit):
+        raise ValueError("stage failed")
+
+    with pytest.raises(ValueError, match="stage failed"):
+        list(run_stages(range(3), [(broken, 1)]))
+
+
+def test_closing_early_does_not_wait_for_running_stage():
+    released = threading.Event()
+
+    def stage(items, emit):
+        for item in items:
+            emit("item", item)
+            if item == 1:
+                # Stands in for a long Whisper/BART call
+                released.wait(5)
+        return []
+
+    events = run_stages(range(10), [(stage, 1)])
+    assert next(events) == ("item", 0)
+    assert next(events) == ("item", 1)
+
+    start = time.perf_counter()
+    events.close()
+    elapsed = time.perf_counter() - start
+    released.set()
+
+    assert elapsed < 0.5
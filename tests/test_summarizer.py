@@ -0,0 +1,38 @@
+from src import summarizer
+
+
+class WhitespaceTokenizer:
+    """One token per word, like the BART tokenizer's interface."""
+
+    def __call__(self, text, add_special_tokens=False):
+        if isinstance(text, str):
+            return {"input_ids": text.split()}
+        return {"input_ids": [t.split() for t in text]}
+
+    def decode(self, ids):
+        return " ".join(ids)
+
+
+class StubPipeline:
+    tokenizer = WhitespaceTokenizer()
+
+
+def test_split_by_tokens_keeps_reading_order(monkeypatch):
+    monkeypatch.setattr(summarizer, "_summarizer", StubPipeline())
+    long_sentence = " ".join(f"c{i}" for i in range(1, 13)) + "."
+
+    pieces = summarizer.split_by_tokens(f"a1 a2. b1 b2. {long_sentence} d1 d2.", max_tokens=5)
+
+    assert pieces == [
+        "a1 a2. b1 b2.",
+        "c1 c2 c3 c4 c5",
+        "c6 c7 c8 c9 c10",
+        "c11 c12.",
+        "d1 d2.",
+    ]
+    assert all(len(piece.split()) <= 5 for piece in pieces)
+
+
+def test_split_by_tokens_returns_short_text_whole(monkeypatch):
+    monkeypatch.setattr(summarizer, "_summarizer", StubPipeline())
+    assert summarizer.split_by_tokens("one two three.", max_tokens=5) == ["one two three."]
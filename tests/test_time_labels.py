@@ -0,0 +1,18 @@
+from src.time_labels import chunk_label
+
+
+def test_whole_minute_chunks_keep_minute_labels():
+    assert chunk_label(0, {}, 5) == "In the first 5 minutes"
+    assert chunk_label(2, {}, 5) == "In the 10-15 minutes"
+    # Pause-cut chunks label their real offsets
+    assert chunk_label(1, {"start": 290.0, "end": 610.0}, 5) == "In the 4-11 minutes"
+
+
+def test_live_windows_get_distinct_second_labels():
+    windows = [{"start": i * 30.0, "end": (i + 1) * 30.0} for i in range(4)]
+    labels = [chunk_label(i, entry, 0.5) for i, entry in enumerate(windows)]
+    assert labels == ["In the first 0:30", "In 0:30-1:00", "In 1:00-1:30", "In 1:30-2:00"]
+
+
+def test_sub_minute_chunks_without_offsets_use_the_grid():
+    assert chunk_label(3, {}, 0.5) == "In 1:30-2:00"
@@ -0,0 +1,53 @@
+import uuid
+
+from src.transcript_store import OWNER, TranscriptStore
+
+
+def transcript(chunk_id):
+    return {"chunk_id": chunk_id, "text": f"chunk {chunk_id}"}
+
+
+def test_journal_resumes_from_what_an_earlier_run_saved(tmp_path):
+    store = TranscriptStore(str(tmp_path / "transcripts.db"))
+    store.create("job", "audio.wav", run={}, params={})
+
+    journal = store.journal("job")
+    journal.put_transcript(transcript(0))
+    journal.put_transcript(transcript(1))
+    journal.put_entry(0, {"summary": "first"})
+
+    # A fresh journal, as the job gets after a crash and restart
+    resumed = store.journal("job")
+    assert resumed.resumed_from() == 2
+    assert resumed.transcript(1) == transcript(1)
+    assert resumed.transcript(2) is None
+    assert resumed.entry(0) == {"summary": "first"}
+    assert resumed.entry(1) is None
+
+
+def test_chunks_are_written_once(tmp_path):
+    store = TranscriptStore(str(tmp_path / "transcripts.db"))
+    store.create("job", "audio.wav", run={}, params={})
+
+    journal = store.journal("job")
+    journal.put_transcript(transcript(0))
+    journal.put_transcript({"chunk_id": 0, "text": "rewritten"})
+
+    assert [row["data"] for row in store.chunks("job")] == [transcript(0)]
+
+
+def test_unfinished_jobs_of_dead_owners_are_claimed(tmp_path):
+    store = TranscriptStore(str(tmp_path / "transcripts.db"))
+    store.create("orphan", "audio.wav", run={"model_name": "base"}, params={})
+    store.create("mine", "audio.wav", run={}, params={})
+    store.start("mine")
+    # Owned by a process that has no live owner lock
+    store._set("orphan", status="running", owner=uuid.uuid4().hex)
+
+    claimed = store.claim_orphans()
+
+    assert [job["job_id"] for job in claimed] == ["orphan"]
+    assert claimed[0]["status"] == "queued"
+    assert claimed[0]["owner"] == OWNER
+    assert claimed[0]["run"] == {"model_name": "base"}
+    assert store.claim_orphans() == []
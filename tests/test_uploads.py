@@ -0,0 +1,75 @@
+import asyncio
+
+import pytest
+
+from backend.services.uploads import UploadError, UploadStore
+
+
+async def body(*chunks, wait=None):
+    for chunk in chunks:
+        if wait is not None:
+            await wait.wait()
+        yield chunk
+
+
+def append(store, upload_id, offset, *chunks):
+    return asyncio.run(store.append(upload_id, offset, body(*chunks)))
+
+
+def test_append_continues_from_the_current_offset(tmp_path):
+    store = UploadStore(root=str(tmp_path))
+    upload_id = store.create(10)["id"]
+
+    assert append(store, upload_id, 0, b"abc", b"de")["offset"] == 5
+    status = append(store, upload_id, 5, b"fghij")
+
+    assert status["offset"] == 10
+    assert status["complete"]
+    with open(store.path(upload_id), "rb") as f:
+        assert f.read() == b"abcdefghij"
+
+
+def test_append_at_the_wrong_offset_is_a_conflict(tmp_path):
+    store = UploadStore(root=str(tmp_path))
+    upload_id = store.create(10)["id"]
+    append(store, upload_id, 0, b"abcde")
+
+    with pytest.raises(UploadError) as error:
+        append(store, upload_id, 3, b"xyz")
+
+    assert error.value.status == 409
+    assert store.status(upload_id)["offset"] == 5
+
+
+def test_concurrent_append_is_a_conflict(tmp_path):
+    store = UploadStore(root=str(tmp_path))
+    upload_id = store.create(10)["id"]
+
+    async def race():
+        wait = asyncio.Event()
+        first = asyncio.create_task(store.append(upload_id, 0, body(b"abc", wait=wait)))
+        while upload_id not in store._writing:
+            await asyncio.sleep(0.01)
+        try:
+            with pytest.raises(UploadError) as error:
+                await store.append(upload_id, 0, body(b"xyz"))
+        finally:
+            wait.set()
+        return error.value.status, await first
+
+    status, first = asyncio.run(race())
+
+    assert status == 409
+    assert first["offset"] == 3
+
+
+def test_bytes_past_the_declared_length_are_rejected(tmp_path):
+    store = UploadStore(root=str(tmp_path))
+    upload_id = store.create(4)["id"]
+
+    with pytest.raises(UploadError) as error:
+        append(store, upload_id, 0, b"ab", b"cdef")
+
+    assert error.value.status == 413
+    # What arrived before the overflow is kept for a resume
+    assert store.status(upload_id)["offset"] == 2
@@ -1,33 +1,43 @@
 """Here the User can record the audio and it will be saved in the dataset folder"""
 
+import queue
+import threading
 import sounddevice as sd
-import numpy as np
-from scipy.io.wavfile import write
+import soundfile as sf
 import keyboard
 
 def record_audio(filename="recording.wav", samplerate=44100, channels=2):
     print("Recording... Press 'q' to stop.")
 
-    recorded_frames = []
+    blocks = queue.Queue()
+    stop = threading.Event()
 
-    # Callback function to store audio chunks
+    # Callback function to hand audio blocks to the writer
     def callback(indata, frames, time, status):
         if status:
             print(status)
-        recorded_frames.append(indata.copy())
-
-    # Start streaming
-    with sd.InputStream(samplerate=samplerate, channels=channels, callback=callback):
-        while True:
-            if keyboard.is_pressed('q'):
-                print("Recording stopped.")
-                break
-
-    # Combine all recorded chunks
-    audio_data = np.concatenate(recorded_frames, axis=0)
-    
-    # Save as WAV file
-    write(filename, samplerate, audio_data)
+        blocks.put(indata.copy())
+
+    # The hotkey sets an event instead of us polling the keyboard in a busy loop
+    keyboard.add_hotkey('q', stop.set)
+
+    # Stream straight into the WAV file so memory doesn't grow with the recording
+    try:
+        with sf.SoundFile(filename, mode="w", samplerate=samplerate, channels=channels) as out:
+            with sd.InputStream(samplerate=samplerate, channels=channels, callback=callback):
+                while not stop.is_set():
+                    try:
+                        out.write(blocks.get(timeout=0.1))
+                    except queue.Empty:
+                        continue
+
+            # Flush whatever arrived before the stream closed
+            while not blocks.empty():
+                out.write(blocks.get_nowait())
+    finally:
+        keyboard.remove_hotkey('q')
+
+    print("Recording stopped.")
     print(f"Saved recording to {filename}")
 
 def save_recording(audio_bytes, filename):
@@ -0,0 +1,64 @@
+"""Fixed-capacity audio ring buffer for live recordings."""
+
+import threading
+import numpy as np
+
+
+class RingBuffer:
+    """
+    Holds at most `capacity` float32 samples. Writes past capacity overwrite
+    the oldest samples (counted in `dropped`), so memory stays bounded no
+    matter how long a recording runs.
+    """
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self._data = np.zeros(capacity, dtype=np.float32)
+        self._start = 0
+        self._size = 0
+        self._position = 0  # absolute index of the oldest buffered sample
+        self.dropped = 0
+        self._lock = threading.Lock()
+
+    @property
+    def available(self):
+        with self._lock:
+            return self._size
+
+    def write(self, samples):
+        samples = np.asarray(samples, dtype=np.float32)
+        with self._lock:
+            # Only the newest `capacity` samples can survive
+            if len(samples) > self.capacity:
+                skipped = len(samples) - self.capacity
+                self.dropped += skipped
+                self._position += skipped
+                samples = samples[-self.capacity:]
+
+            overflow = self._size + len(samples) - self.capacity
+            if overflow > 0:
+                self._start = (self._start + overflow) % self.capacity
+                self._size -= overflow
+                self.dropped += overflow
+                self._position += overflow
+
+            end = (self._start + self._size) % self.capacity
+            first = min(len(samples), self.capacity - end)
+            self._data[end:end + first] = samples[:first]
+            self._data[:len(samples) - first] = samples[first:]
+            self._size += len(samples)
+
+    def read(self, n):
+        """
+        Remove up to `n` of the oldest samples. Returns `(position, samples)`
+        where `position` is the index of the first sample in the whole stream.
+        """
+        with self._lock:
+            n = min(n, self._size)
+            idx = (self._start + np.arange(n)) % self.capacity
+            out = self._data[idx]
+            position = self._position
+            self._start = (self._start + n) % self.capacity
+            self._size -= n
+            self._position += n
+            return position, out